@@ -25,11 +25,7 @@ vector<int> dijkstra(int src, int V) {
     return dist;
 }
 
-int main() {
-    string input;
-    getline(cin, input);
-    json j = json::parse(input);
-
+json solve(const json &j) {
     int V = j["V"];
     int src = j["source"];
     auto edges = j["edges"];
@@ -42,7 +38,27 @@ int main() {
 
     json out;
     out["distances"] = result;
-    cout << out.dump() << endl;
+    return out;
+}
+
+int main() {
+    // One request per line; keep serving until stdin is closed.
+    // {"batch": [...]} answers a list of requests in one round-trip.
+    string input;
+    while (getline(cin, input)) {
+        if (input.empty()) continue;
+        json j = json::parse(input);
+
+        json out;
+        if (j.contains("batch")) {
+            out["batch"] = json::array();
+            for (auto &item : j["batch"])
+                out["batch"].push_back(solve(item));
+        } else {
+            out = solve(j);
+        }
+        cout << out.dump() << endl;  // endl flushes the response
+    }
 
     return 0;
 }
@@ -0,0 +1,371 @@
+"""
+Numba Kernels Module
+
+This module provides JIT-compiled kernels for the hot numeric loops used by the
+driver matcher and the pathfinding algorithms. The haversine kernel fuses what
+would otherwise be a chain of NumPy temporaries into a single pass over the
+coordinate arrays; callers pass the cosine of every latitude alongside the
+radian coordinates, since those never change between queries. The shortest
+path kernels run Dijkstra and A* directly on the graph's CSR arrays with a
+binary heap held in two parallel arrays (keys and node indices). The heap is
+indexed: a position array maps each node to its heap slot, so an improved
+cost decreases the node's key in place instead of queueing a duplicate entry.
+The A* heuristic combines the haversine distance with optional landmark (ALT)
+lower bounds. The ride tick kernel advances the simulator's ride slots and
+interpolates their positions without holding the GIL, so request threads doing
+other work (matching, pathfinding, encoding responses) keep running while the
+simulation thread steps; changes to the rides themselves still wait for the
+simulator's lock. The closest-driver kernel picks the nearest eligible point
+within a radius in one pass, without allocating the distance array at all.
+
+Numba is optional: if it cannot be imported, haversine_all, advance_segments
+and closest_within fall back to equivalent NumPy implementations, and the pathfinding module keeps using its
+Python implementations (check NUMBA_AVAILABLE before calling the path kernels).
+
+Time Complexity Analysis:
+- haversine_all: O(N) single sweep, one output array
+- dijkstra_csr / a_star_csr: O((V + E) log V), heap of at most V entries (decrease-key)
+- advance_segments: O(R) single sweep over the moving ride slots
+- closest_within: O(N) single sweep, no temporaries
+"""
+
+import math
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+EARTH_RADIUS_KM = 6371.0
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(fastmath=True, cache=True)
+    def _haversine_all(lat_r, lng_r, lat_arr, lng_arr, cos_lat_arr):
+        cos_lat = math.cos(lat_r)
+        out = np.empty(lat_arr.shape[0], dtype=np.float64)
+        for i in range(lat_arr.shape[0]):
+            s_lat = math.sin((lat_arr[i] - lat_r) * 0.5)
+            s_lng = math.sin((lng_arr[i] - lng_r) * 0.5)
+            a = s_lat * s_lat + cos_lat * cos_lat_arr[i] * s_lng * s_lng
+            out[i] = 2.0 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+        return out
+
+
+    @njit(cache=True)
+    def _heap_sift_up(keys, vals, pos, i):
+        # Move entry i towards the root; ties are ordered by node index
+        key = keys[i]
+        val = vals[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            if keys[parent] < key or (keys[parent] == key and vals[parent] <= val):
+                break
+            keys[i] = keys[parent]
+            vals[i] = vals[parent]
+            pos[vals[i]] = i
+            i = parent
+        keys[i] = key
+        vals[i] = val
+        pos[val] = i
+
+    @njit(cache=True)
+    def _heap_push_or_decrease(keys, vals, pos, size, key, val):
+        # pos[val] is the node's slot in the heap, -1 if never queued, -2 once popped
+        i = pos[val]
+        if i == -2:
+            return size
+        if i == -1:
+            i = size
+            size += 1
+        elif keys[i] <= key:
+            return size
+        keys[i] = key
+        vals[i] = val
+        _heap_sift_up(keys, vals, pos, i)
+        return size
+
+    @njit(cache=True)
+    def _heap_pop(keys, vals, pos, size):
+        key = keys[0]
+        val = vals[0]
+        pos[val] = -2
+        size -= 1
+        last_key = keys[size]
+        last_val = vals[size]
+
+        # Sift the last entry down from the root
+        i = 0
+        while True:
+            child = 2 * i + 1
+            if child >= size:
+                break
+            if child + 1 < size and (keys[child + 1] < keys[child] or
+                                     (keys[child + 1] == keys[child] and vals[child + 1] < vals[child])):
+                child += 1
+            if keys[child] < last_key or (keys[child] == last_key and vals[child] < last_val):
+                keys[i] = keys[child]
+                vals[i] = vals[child]
+                pos[vals[i]] = i
+                i = child
+            else:
+                break
+        if size > 0:
+            keys[i] = last_key
+            vals[i] = last_val
+            pos[last_val] = i
+        return key, val, size
+
+    @njit(cache=True)
+    def _dijkstra_csr(offsets, neighbors, weights, src, dst):
+        n = offsets.shape[0] - 1
+        dist = np.full(n, np.inf)
+        pred = np.full(n, -1, dtype=np.int32)
+        keys = np.empty(n, dtype=np.float64)
+        vals = np.empty(n, dtype=np.int32)
+        pos = np.full(n, -1, dtype=np.int32)
+
+        dist[src] = 0.0
+        size = _heap_push_or_decrease(keys, vals, pos, 0, 0.0, src)
+        while size > 0:
+            _, u, size = _heap_pop(keys, vals, pos, size)
+            if u == dst:
+                break
+            for e in range(offsets[u], offsets[u + 1]):
+                v = neighbors[e]
+                new_dist = dist[u] + weights[e]
+                if new_dist < dist[v]:
+                    dist[v] = new_dist
+                    pred[v] = u
+                    size = _heap_push_or_decrease(keys, vals, pos, size, new_dist, v)
+        return dist, pred
+
+    @njit(cache=True)
+    def _a_star_heuristic(v, dst, lat, lng, cos_lat, h_scale, lm_from, lm_to):
+        # Straight-line distance to the goal, scaled to the cost type
+        s_lat = math.sin((lat[dst] - lat[v]) / 2)
+        s_lng = math.sin((lng[dst] - lng[v]) / 2)
+        a = s_lat * s_lat + cos_lat[v] * cos_lat[dst] * s_lng * s_lng
+        h = 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a)) * h_scale
+
+        # Landmark (ALT) lower bounds; NaN from inf - inf never compares greater
+        for k in range(lm_from.shape[0]):
+            bound = lm_from[k, dst] - lm_from[k, v]
+            if bound > h:
+                h = bound
+            bound = lm_to[k, v] - lm_to[k, dst]
+            if bound > h:
+                h = bound
+        return h
+
+    @njit(cache=True)
+    def _a_star_csr(offsets, neighbors, weights, lat, lng, cos_lat, src, dst, h_scale, lm_from, lm_to):
+        n = offsets.shape[0] - 1
+        g = np.full(n, np.inf)
+        pred = np.full(n, -1, dtype=np.int32)
+        keys = np.empty(n, dtype=np.float64)
+        vals = np.empty(n, dtype=np.int32)
+        pos = np.full(n, -1, dtype=np.int32)
+
+        g[src] = 0.0
+        h = _a_star_heuristic(src, dst, lat, lng, cos_lat, h_scale, lm_from, lm_to)
+        size = _heap_push_or_decrease(keys, vals, pos, 0, h, src)
+        while size > 0:
+            _, u, size = _heap_pop(keys, vals, pos, size)
+            if u == dst:
+                break
+            for e in range(offsets[u], offsets[u + 1]):
+                v = neighbors[e]
+                tentative = g[u] + weights[e]
+                if tentative < g[v]:
+                    pred[v] = u
+                    g[v] = tentative
+                    if pos[v] == -2:
+                        continue  # already expanded; closed nodes are not reopened
+                    h = _a_star_heuristic(v, dst, lat, lng, cos_lat, h_scale, lm_from, lm_to)
+                    size = _heap_push_or_decrease(keys, vals, pos, size, tentative + h, v)
+        return g, pred
+
+    # 'contract' only allows fusing a multiply and an add into one FMA; unlike
+    # full fastmath it keeps NaN and inf well defined
+    @njit(nogil=True, fastmath={'contract'}, cache=True)
+    def _advance_segments(slots, seg_prog, seg_inv_len, seg_from, seg_to, step_km):
+        out = np.empty((slots.shape[0], 2), dtype=np.float64)
+        for k in range(slots.shape[0]):
+            i = slots[k]
+            # One FMA with the precomputed inverse length instead of a divide
+            p = seg_prog[i] + step_km * seg_inv_len[i]
+            seg_prog[i] = p
+            if p > 1.0:
+                p = 1.0
+            # Two-sided lerp: one multiply and one FMA per coordinate, and
+            # exact at both ends of the segment
+            q = 1.0 - p
+            out[k, 0] = seg_from[i, 0] * q + seg_to[i, 0] * p
+            out[k, 1] = seg_from[i, 1] * q + seg_to[i, 1] * p
+        return out
+
+    # No fastmath: NaN coordinates (drivers without a location) must never match
+    @njit(nogil=True, cache=True)
+    def _closest_within(lat_r, lng_r, cos_lat, lat_arr, lng_arr, cos_lat_arr, mask, radius_km):
+        best = -1
+        best_dist = np.inf
+        for i in range(lat_arr.shape[0]):
+            if not mask[i]:
+                continue
+            s_lat = math.sin((lat_arr[i] - lat_r) * 0.5)
+            s_lng = math.sin((lng_arr[i] - lng_r) * 0.5)
+            a = s_lat * s_lat + cos_lat * cos_lat_arr[i] * s_lng * s_lng
+            d = 2.0 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+            # Strictly closer, so ties keep the earliest point
+            if d <= radius_km and d < best_dist:
+                best = i
+                best_dist = d
+        return best, best_dist
+
+
+def haversine_all(lat_r: float, lng_r: float,
+                  lat_arr: np.ndarray, lng_arr: np.ndarray,
+                  cos_lat_arr: np.ndarray) -> np.ndarray:
+    """
+    Calculate the great circle distance from a reference point to every point.
+
+    Args:
+        lat_r: Latitude of the reference point in radians
+        lng_r: Longitude of the reference point in radians
+        lat_arr: Array of latitudes in radians
+        lng_arr: Array of longitudes in radians
+        cos_lat_arr: Array of the cosines of lat_arr
+
+    Returns:
+        Array of distances in kilometers
+    """
+    if NUMBA_AVAILABLE:
+        return _haversine_all(lat_r, lng_r, lat_arr, lng_arr, cos_lat_arr)
+
+    a = (np.sin((lat_arr - lat_r) / 2) ** 2
+         + math.cos(lat_r) * cos_lat_arr * np.sin((lng_arr - lng_r) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def dijkstra_csr(offsets: np.ndarray, neighbors: np.ndarray, weights: np.ndarray,
+                 src: int, dst: int = -1) -> tuple:
+    """
+    Dijkstra's algorithm on CSR arrays (requires numba).
+
+    Args:
+        offsets: int32[V+1] CSR row offsets
+        neighbors: int32[E] target node index of each edge
+        weights: [E] cost of each edge
+        src: Index of the start node
+        dst: Index of the goal node to stop at, or -1 to search the whole graph
+
+    Returns:
+        Tuple of (dist, pred): float64[V] costs from src and int32[V]
+        predecessor indices (-1 for none)
+    """
+    if not NUMBA_AVAILABLE:
+        raise RuntimeError("dijkstra_csr requires numba")
+    return _dijkstra_csr(offsets, neighbors, weights, src, dst)
+
+
+def a_star_csr(offsets: np.ndarray, neighbors: np.ndarray, weights: np.ndarray,
+               lat_arr: np.ndarray, lng_arr: np.ndarray, cos_lat_arr: np.ndarray,
+               src: int, dst: int, h_scale: float,
+               lm_from: np.ndarray = None, lm_to: np.ndarray = None) -> tuple:
+    """
+    A* on CSR arrays with an inlined heuristic (requires numba).
+
+    The heuristic of a node is its haversine distance to the goal times
+    h_scale, raised to the landmark (ALT) lower bound when landmark costs
+    are given.
+
+    Args:
+        offsets: int32[V+1] CSR row offsets
+        neighbors: int32[E] target node index of each edge
+        weights: [E] cost of each edge
+        lat_arr: Node latitudes in radians
+        lng_arr: Node longitudes in radians
+        cos_lat_arr: Cosines of the node latitudes
+        src: Index of the start node
+        dst: Index of the goal node
+        h_scale: Cost per kilometer of straight-line distance used by the heuristic
+        lm_from: Optional float64[K, V] costs from each landmark to every node
+        lm_to: Optional float64[K, V] costs from every node to each landmark
+
+    Returns:
+        Tuple of (g, pred): float64[V] costs from src and int32[V]
+        predecessor indices (-1 for none)
+    """
+    if not NUMBA_AVAILABLE:
+        raise RuntimeError("a_star_csr requires numba")
+    if lm_from is None or lm_to is None:
+        lm_from = lm_to = np.empty((0, 0))
+    return _a_star_csr(offsets, neighbors, weights, lat_arr, lng_arr, cos_lat_arr, src, dst, h_scale,
+                       lm_from, lm_to)
+
+
+def advance_segments(slots: np.ndarray, seg_prog: np.ndarray, seg_inv_len: np.ndarray,
+                     seg_from: np.ndarray, seg_to: np.ndarray, step_km: float) -> np.ndarray:
+    """
+    Advance ride slots along their segments and interpolate their positions.
+
+    seg_prog is updated in place (values of 1.0 or more mean the segment was
+    finished); the returned positions clamp the progress to the segment end.
+
+    Args:
+        slots: intp[N] slots to advance
+        seg_prog: float64[S] progress of every slot along its segment
+        seg_inv_len: float64[S] inverse segment length of every slot in 1/km
+        seg_from: float64[S, 2] (lat, lng) of every segment start
+        seg_to: float64[S, 2] (lat, lng) of every segment end
+        step_km: Distance covered in this step in kilometers
+
+    Returns:
+        float64[N, 2] (lat, lng) of each advanced slot
+    """
+    if NUMBA_AVAILABLE:
+        return _advance_segments(slots, seg_prog, seg_inv_len, seg_from, seg_to, step_km)
+
+    seg_prog[slots] += step_km * seg_inv_len[slots]
+    progress = np.minimum(seg_prog[slots], 1.0)[:, None]
+    return seg_from[slots] * (1.0 - progress) + seg_to[slots] * progress
+
+
+def closest_within(lat_r: float, lng_r: float, cos_lat: float,
+                   lat_arr: np.ndarray, lng_arr: np.ndarray, cos_lat_arr: np.ndarray,
+                   mask: np.ndarray, radius_km: float) -> tuple:
+    """
+    Find the closest of a set of points within a radius of a reference point.
+
+    Args:
+        lat_r: Latitude of the reference point in radians
+        lng_r: Longitude of the reference point in radians
+        cos_lat: Cosine of lat_r
+        lat_arr: Array of latitudes in radians (NaN points never match)
+        lng_arr: Array of longitudes in radians
+        cos_lat_arr: Array of the cosines of lat_arr
+        mask: bool array of the points that may be chosen
+        radius_km: Maximum distance in kilometers
+
+    Returns:
+        Tuple of (index, distance_km) of the closest point (the first one on
+        ties), or (-1, inf) if no chosen point is within the radius
+    """
+    if NUMBA_AVAILABLE:
+        best, best_dist = _closest_within(lat_r, lng_r, cos_lat, lat_arr, lng_arr, cos_lat_arr,
+                                          mask, radius_km)
+        return int(best), float(best_dist)
+
+    a = (np.sin((lat_arr - lat_r) * 0.5) ** 2
+         + cos_lat * cos_lat_arr * np.sin((lng_arr - lng_r) * 0.5) ** 2)
+    distances = 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+    distances = np.where(mask & (distances <= radius_km), distances, np.inf)
+    best = int(np.argmin(distances)) if len(distances) else -1
+    if best < 0 or np.isinf(distances[best]):
+        return -1, math.inf
+    return best, float(distances[best])
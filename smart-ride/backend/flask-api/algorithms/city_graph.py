@@ -8,6 +8,15 @@ Time Complexity Analysis:
 - Graph Creation: O(V + E) where V is the number of vertices and E is the number of edges
 - Node Lookup: O(1) using dictionary-based storage
 - Edge Cost Lookup: O(1) 
+- CSR Adjacency Build (finalize): O(V + E log E) for the forward and reverse
+  adjacency, once per change to the graph
+- Nearest Node Lookup: O(log V) with a KD-tree over float32 unit-sphere coordinates
+  on large graphs; O(V) trig-free pass over the same coordinates on small ones
+- Batch Nearest Node Lookup (N points): O(N log V) with the KD-tree, otherwise
+  one vectorized O(N * V) pass
+- Connected Components: O(V + E), once per change to the graph
+- Landmark Costs (ALT): O(K (V + E) log V) for K landmarks, once per cost type
+  and change to the graph
 
 Space Complexity: O(V + E) to store the entire graph
 """
@@ -15,11 +24,31 @@ Space Complexity: O(V + E) to store the entire graph
 import math
 import json
 import os
+import sys
+from collections import defaultdict
 from typing import Dict, List, Set, Tuple, Optional
 
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components, dijkstra as csgraph_dijkstra
+from scipy.spatial import cKDTree
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Graphs smaller than this are scanned linearly: building and querying a KD-tree
+# costs more than one fused sweep over a handful of nodes
+KDTREE_MIN_NODES = 64
+
+# Number of landmarks whose shortest-path costs back the A* (ALT) heuristic
+ALT_LANDMARKS = 16
+
 
 class CityNode:
     """Represents a node (intersection) in the city graph."""
+    __slots__ = ('id', 'lat', 'lng', 'name', 'neighbors', 'lat_rad', 'lng_rad', 'cos_lat')
     
     def __init__(self, node_id: str, lat: float, lng: float, name: str = None):
         """
@@ -31,11 +60,17 @@ class CityNode:
             lng: Longitude coordinate
             name: Optional name for the intersection/location
         """
-        self.id = node_id
+        # Interned, so that the many dict lookups keyed by node ID compare by identity
+        self.id = sys.intern(node_id) if isinstance(node_id, str) else node_id
         self.lat = lat
         self.lng = lng
         self.name = name or f"Node {node_id}"
         self.neighbors = {}  # Dictionary of neighbor_id -> (distance, time)
+        
+        # Coordinates never change, so the trig used by haversine is computed once
+        self.lat_rad = math.radians(lat)
+        self.lng_rad = math.radians(lng)
+        self.cos_lat = math.cos(self.lat_rad)
     
     def add_neighbor(self, neighbor_id: str, distance: float, time: float):
         """
@@ -70,6 +105,43 @@ class CityGraph:
     def __init__(self):
         """Initialize an empty city graph."""
         self.nodes = {}  # Dictionary of node_id -> CityNode
+        self.version = 0  # Bumped on every mutation; used to key caches of derived results
+        
+        # Dense, array-based views of the graph, rebuilt lazily by finalize()
+        # whenever nodes or edges have been added since the last build.
+        self._dirty = False
+        self._ids: List[str] = []  # dense index -> node_id
+        self._id_to_idx: Dict[str, int] = {}  # node_id -> dense index
+        
+        # Structure-of-arrays node coordinates (in radians) for nearest-node queries
+        self._lat_rad = np.empty(0, dtype=np.float64)
+        self._lng_rad = np.empty(0, dtype=np.float64)
+        self._cos_lat = np.empty(0, dtype=np.float64)
+        
+        # float32 unit-sphere (x, y, z) of every node; the squared chord length
+        # between two of these is monotonic in their great-circle distance
+        self._xyz = np.empty((0, 3), dtype=np.float32)
+        self._kdtree = None  # cKDTree over self._xyz, large graphs only
+        
+        # CSR adjacency: the edges leaving node v are positions offsets[v]:offsets[v+1]
+        self._offsets = np.zeros(1, dtype=np.int32)
+        self._neighbor_idx = np.empty(0, dtype=np.int32)
+        self._edge_dist = np.empty(0, dtype=np.float32)
+        self._edge_time = np.empty(0, dtype=np.float32)
+        
+        # The same edges grouped by target node (the transposed graph), for
+        # searches that run backwards from a destination
+        self._rev_offsets = np.zeros(1, dtype=np.int32)
+        self._rev_neighbor_idx = np.empty(0, dtype=np.int32)
+        self._rev_edge_dist = np.empty(0, dtype=np.float32)
+        self._rev_edge_time = np.empty(0, dtype=np.float32)
+        
+        # Per-cost-type float64 edge weights in CSR order and SciPy sparse
+        # matrices over the CSR arrays, both keyed by (cost_type, reverse)
+        self._edge_weights: Dict[Tuple[str, bool], np.ndarray] = {}
+        self._csr_matrices: Dict[Tuple[str, bool], csr_matrix] = {}
+        self._components: Optional[np.ndarray] = None  # see get_components
+        self._landmark_distances: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}  # by cost_type
         
     def add_node(self, node: CityNode):
         """
@@ -79,6 +151,8 @@ class CityGraph:
             node: The CityNode to add
         """
         self.nodes[node.id] = node
+        self.version += 1
+        self._dirty = True
     
     def add_edge(self, node1_id: str, node2_id: str, distance: float, time: float, bidirectional: bool = True):
         """
@@ -92,9 +166,294 @@ class CityGraph:
             bidirectional: If True, add edges in both directions
         """
         if node1_id in self.nodes and node2_id in self.nodes:
-            self.nodes[node1_id].add_neighbor(node2_id, distance, time)
+            node1 = self.nodes[node1_id]
+            node2 = self.nodes[node2_id]
+            node1.add_neighbor(node2.id, distance, time)
             if bidirectional:
-                self.nodes[node2_id].add_neighbor(node1_id, distance, time)
+                node2.add_neighbor(node1.id, distance, time)
+            self.version += 1
+            self._dirty = True
+    
+    def finalize(self):
+        """
+        Build the dense array views of the graph.
+        
+        Assigns every node a dense integer index, fills the radian coordinate
+        arrays (and KD-tree) used by get_nearest_node, and flattens the neighbor
+        dictionaries into CSR arrays for cache-friendly edge traversal. Called
+        automatically by the accessors when the graph has changed.
+        """
+        count = len(self.nodes)
+        self._ids = list(self.nodes.keys())
+        self._id_to_idx = {node_id: idx for idx, node_id in enumerate(self._ids)}
+        
+        self._set_node_arrays(
+            np.fromiter((node.lat_rad for node in self.nodes.values()), dtype=np.float64, count=count),
+            np.fromiter((node.lng_rad for node in self.nodes.values()), dtype=np.float64, count=count)
+        )
+        
+        # Collect the edges in node order, then flatten them into CSR
+        edge_from = []
+        edge_to = []
+        edge_dist = []
+        edge_time = []
+        for idx, node in enumerate(self.nodes.values()):
+            for neighbor_id, (distance, time) in node.neighbors.items():
+                edge_from.append(idx)
+                edge_to.append(self._id_to_idx[neighbor_id])
+                edge_dist.append(distance)
+                edge_time.append(time)
+        
+        self._set_csr(edge_from, edge_to, edge_dist, edge_time)
+        self._dirty = False
+    
+    def _set_node_arrays(self, lat_rad: np.ndarray, lng_rad: np.ndarray):
+        """
+        Install the radian coordinate arrays and rebuild the KD-tree.
+        
+        Args:
+            lat_rad: Latitudes in radians, in dense index order
+            lng_rad: Longitudes in radians, in dense index order
+        """
+        self._lat_rad = lat_rad
+        self._lng_rad = lng_rad
+        self._cos_lat = np.cos(lat_rad)
+        
+        # Euclidean (chord) distance between unit vectors is monotonic in the
+        # great-circle distance, so a plain KD-tree answers nearest-node queries
+        self._xyz = unit_sphere_xyz(lat_rad, lng_rad).astype(np.float32)
+        if len(lat_rad) >= KDTREE_MIN_NODES:
+            self._kdtree = cKDTree(self._xyz)
+        else:
+            self._kdtree = None
+    
+    def _set_csr(self, edge_from, edge_to, edge_dist, edge_time):
+        """
+        Build the forward and reverse CSR adjacency arrays from edge columns.
+        
+        Args:
+            edge_from: Dense index of the source node of each edge
+            edge_to: Dense index of the target node of each edge
+            edge_dist: Distance of each edge in kilometers
+            edge_time: Time of each edge in minutes
+        """
+        count = len(self._ids)
+        edge_from = np.asarray(edge_from, dtype=np.int32)
+        edge_to = np.asarray(edge_to, dtype=np.int32)
+        edge_dist = np.asarray(edge_dist, dtype=np.float32)
+        edge_time = np.asarray(edge_time, dtype=np.float32)
+        
+        (self._offsets, self._neighbor_idx,
+         self._edge_dist, self._edge_time) = _group_edges(edge_from, edge_to, edge_dist, edge_time, count)
+        (self._rev_offsets, self._rev_neighbor_idx,
+         self._rev_edge_dist, self._rev_edge_time) = _group_edges(edge_to, edge_from, edge_dist, edge_time, count)
+        self._edge_weights = {}
+        self._csr_matrices = {}
+        self._components = None
+        self._landmark_distances = {}
+    
+    def get_csr(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, List[str], Dict[str, int]]:
+        """
+        Get the CSR representation of the graph.
+        
+        Returns:
+            Tuple of (offsets, neighbor_idx, edge_dist, edge_time, ids, id_to_idx):
+                offsets: int32[V+1], edges of node v are offsets[v]:offsets[v+1]
+                neighbor_idx: int32[E] dense index of each edge's target node
+                edge_dist: float32[E] edge distances in kilometers
+                edge_time: float32[E] edge times in minutes
+                ids: List mapping dense index -> node_id
+                id_to_idx: Dictionary mapping node_id -> dense index
+        """
+        if self._dirty:
+            self.finalize()
+        
+        return (self._offsets, self._neighbor_idx, self._edge_dist, self._edge_time,
+                self._ids, self._id_to_idx)
+    
+    def get_reverse_csr(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, List[str], Dict[str, int]]:
+        """
+        Get the CSR representation of the transposed graph.
+        
+        Same layout as get_csr, but the edges of node v are the edges arriving
+        at v, and neighbor_idx holds the dense index of each edge's source node.
+        
+        Returns:
+            Tuple of (offsets, neighbor_idx, edge_dist, edge_time, ids, id_to_idx)
+        """
+        if self._dirty:
+            self.finalize()
+        
+        return (self._rev_offsets, self._rev_neighbor_idx, self._rev_edge_dist, self._rev_edge_time,
+                self._ids, self._id_to_idx)
+    
+    @property
+    def node_index(self) -> Dict[str, int]:
+        """Dictionary mapping node_id -> dense index used by the array views."""
+        if self._dirty:
+            self.finalize()
+        return self._id_to_idx
+    
+    @property
+    def node_ids(self) -> List[str]:
+        """List mapping dense index -> node_id."""
+        if self._dirty:
+            self.finalize()
+        return self._ids
+    
+    def get_coordinate_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get the node coordinates as arrays in dense index order.
+        
+        Returns:
+            Tuple of (lat_rad, lng_rad, cos_lat) float64 arrays
+        """
+        if self._dirty:
+            self.finalize()
+        
+        return self._lat_rad, self._lng_rad, self._cos_lat
+    
+    def to_csr(self, cost_type: str = 'time', reverse: bool = False) -> csr_matrix:
+        """
+        Get the graph as a SciPy sparse adjacency matrix (cached until the graph changes).
+        
+        Args:
+            cost_type: 'time' or 'distance' edge weights
+            reverse: If True, return the transposed graph
+            
+        Returns:
+            V x V csr_matrix whose entry (u, v) is the weight of the edge u -> v,
+            with rows and columns in dense index order
+        """
+        if self._dirty:
+            self.finalize()
+        
+        key = (cost_type, reverse)
+        matrix = self._csr_matrices.get(key)
+        if matrix is None:
+            offsets, neighbor_idx = (self._rev_offsets, self._rev_neighbor_idx) if reverse else (
+                self._offsets, self._neighbor_idx)
+            count = len(self._ids)
+            matrix = csr_matrix((self.get_edge_weights(cost_type, reverse), neighbor_idx, offsets),
+                                shape=(count, count))
+            self._csr_matrices[key] = matrix
+        
+        return matrix
+    
+    def get_edge_weights(self, cost_type: str = 'time', reverse: bool = False) -> np.ndarray:
+        """
+        Get the cost of every edge for one cost type (cached until the graph changes).
+        
+        Selecting the weights once per query keeps the cost_type branch out of
+        the per-edge loops of the search algorithms.
+        
+        Args:
+            cost_type: 'time' or 'distance'
+            reverse: If True, return the weights in reverse CSR order
+            
+        Returns:
+            float64[E] array aligned with the neighbor_idx of get_csr (or of
+            get_reverse_csr when reverse is True)
+        """
+        if self._dirty:
+            self.finalize()
+        
+        key = (cost_type, reverse)
+        weights = self._edge_weights.get(key)
+        if weights is None:
+            if reverse:
+                weights = self._rev_edge_dist if cost_type == 'distance' else self._rev_edge_time
+            else:
+                weights = self._edge_dist if cost_type == 'distance' else self._edge_time
+            weights = weights.astype(np.float64)
+            self._edge_weights[key] = weights
+        
+        return weights
+    
+    def get_components(self) -> np.ndarray:
+        """
+        Get the weakly connected component of every node (cached until the graph changes).
+        
+        Two nodes with different labels have no path between them in either
+        direction, which lets a search for an unreachable goal return at once.
+        
+        Returns:
+            int32[V] component label of each node, in dense index order
+        """
+        if self._dirty:
+            self.finalize()
+        
+        if self._components is None:
+            count = len(self._ids)
+            adjacency = csr_matrix((np.ones(len(self._neighbor_idx), dtype=np.int8),
+                                    self._neighbor_idx, self._offsets), shape=(count, count))
+            _, self._components = connected_components(adjacency, directed=True, connection='weak')
+        
+        return self._components
+    
+    def get_landmark_distances(self, cost_type: str = 'time') -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the shortest-path costs from and to a set of landmark nodes (cached until the graph changes).
+        
+        By the triangle inequality, for every landmark L the larger of
+        d(L, t) - d(L, v) and d(v, L) - d(t, L) is a lower bound on the cost of
+        getting from v to t, which gives A* its landmark (ALT) heuristic.
+        
+        Args:
+            cost_type: 'time' or 'distance'
+            
+        Returns:
+            Tuple of (from_landmarks, to_landmarks), float64[K, V] arrays of the
+            cost from each landmark to every node and from every node to each
+            landmark (inf if unreachable), with K = min(ALT_LANDMARKS, V)
+        """
+        if self._dirty:
+            self.finalize()
+        
+        distances = self._landmark_distances.get(cost_type)
+        if distances is None:
+            landmarks = self._select_landmarks(ALT_LANDMARKS)
+            if len(landmarks):
+                distances = (
+                    csgraph_dijkstra(self.to_csr(cost_type), directed=True, indices=landmarks),
+                    csgraph_dijkstra(self.to_csr(cost_type, reverse=True), directed=True, indices=landmarks)
+                )
+            else:
+                distances = (np.empty((0, 0)), np.empty((0, 0)))
+            self._landmark_distances[cost_type] = distances
+        
+        return distances
+    
+    def _select_landmarks(self, count: int) -> np.ndarray:
+        """
+        Pick up to count landmark nodes spread over the map (farthest-first).
+        
+        Args:
+            count: Maximum number of landmarks
+            
+        Returns:
+            int32 array of dense node indices
+        """
+        if not len(self._ids):
+            return np.empty(0, dtype=np.int32)
+        
+        # Start at the node farthest from an arbitrary one, then keep adding the
+        # node farthest from every landmark chosen so far; squared chord lengths
+        # order nodes the same way as great-circle distances
+        xyz = self._xyz
+        nearest = np.einsum('ij,ij->i', xyz - xyz[0], xyz - xyz[0])
+        landmarks = []
+        next_idx = int(np.argmax(nearest))
+        nearest = np.full(len(xyz), np.inf, dtype=np.float32)
+        while len(landmarks) < count:
+            landmarks.append(next_idx)
+            diff = xyz - xyz[next_idx]
+            np.minimum(nearest, np.einsum('ij,ij->i', diff, diff), out=nearest)
+            next_idx = int(np.argmax(nearest))
+            if nearest[next_idx] <= 0:
+                break  # every node sits on a landmark
+        
+        return np.array(landmarks, dtype=np.int32)
     
     def get_node(self, node_id: str) -> Optional[CityNode]:
         """
@@ -128,56 +487,113 @@ class CityGraph:
         Returns:
             Tuple of (node_id, distance) of the nearest node
         """
-        nearest_node_id = None
-        min_distance = float('inf')
+        if self._dirty:
+            self.finalize()
         
-        for node_id, node in self.nodes.items():
-            distance = haversine_distance(lat, lng, node.lat, node.lng)
-            if distance < min_distance:
-                min_distance = distance
-                nearest_node_id = node_id
+        if not self._ids:
+            return None, float('inf')
         
-        return nearest_node_id, min_distance
+        lat_r = math.radians(lat)
+        lng_r = math.radians(lng)
+        query = unit_sphere_xyz(lat_r, lng_r).astype(np.float32)
+        
+        if self._kdtree is not None:
+            _, idx = self._kdtree.query(query)
+            idx = int(idx)
+        else:
+            # Smallest squared chord length; no trig per node
+            diff = self._xyz - query
+            idx = int(np.argmin(np.einsum('ij,ij->i', diff, diff)))
+        
+        # The reported distance is exact, from the float64 coordinates
+        min_distance = haversine_distance_rad(lat_r, math.cos(lat_r), lng_r,
+                                              self._lat_rad[idx], self._cos_lat[idx], self._lng_rad[idx])
+        
+        return self._ids[idx], min_distance
+    
+    def get_nearest_nodes(self, lats, lngs) -> Tuple[List[str], np.ndarray]:
+        """
+        Find the nearest node to each of a batch of points.
+        
+        Args:
+            lats: Sequence of latitude coordinates
+            lngs: Sequence of longitude coordinates
+            
+        Returns:
+            Tuple of (node_ids, distances): the nearest node ID for every point
+            and an array of the distances to them in kilometers
+        """
+        if self._dirty:
+            self.finalize()
+        
+        lat_r = np.radians(np.asarray(lats, dtype=np.float64))
+        lng_r = np.radians(np.asarray(lngs, dtype=np.float64))
+        
+        if not self._ids:
+            return [None] * len(lat_r), np.full(len(lat_r), np.inf)
+        
+        query = unit_sphere_xyz(lat_r, lng_r).astype(np.float32)
+        
+        if self._kdtree is not None:
+            _, idx = self._kdtree.query(query)
+        else:
+            # One (points x nodes) pass over the squared chord lengths
+            diff = self._xyz[None, :, :] - query[:, None, :]
+            idx = np.argmin(np.einsum('ijk,ijk->ij', diff, diff), axis=1)
+        
+        distances = haversine_vector(lat_r, lng_r, self._lat_rad[idx], self._lng_rad[idx])
+        
+        return [self._ids[i] for i in idx.tolist()], distances
     
     def save_to_file(self, filename: str):
         """
         Save the graph to a JSON file.
         
+        Nodes and edges are written as parallel column arrays; edge endpoints
+        are stored as positions in the node id column.
+        
         Args:
             filename: Path to the file to save to
         """
+        if self._dirty:
+            self.finalize()
+        
+        nodes = list(self.nodes.values())
         graph_data = {
-            "nodes": {},
-            "edges": []
+            "nodes": {
+                "ids": self._ids,
+                "lats": [node.lat for node in nodes],
+                "lngs": [node.lng for node in nodes],
+                "names": [node.name for node in nodes]
+            },
+            "edges": {"from": [], "to": [], "distance": [], "time": []}
         }
         
-        # Save nodes
-        for node_id, node in self.nodes.items():
-            graph_data["nodes"][node_id] = {
-                "id": node.id,
-                "lat": node.lat,
-                "lng": node.lng,
-                "name": node.name
-            }
-        
-        # Save edges
-        for node_id, node in self.nodes.items():
+        # Save edges, keeping the full-precision weights from the neighbor dicts
+        edges = graph_data["edges"]
+        for idx, node in enumerate(nodes):
             for neighbor_id, (distance, time) in node.neighbors.items():
-                graph_data["edges"].append({
-                    "from": node_id,
-                    "to": neighbor_id,
-                    "distance": distance,
-                    "time": time
-                })
+                edges["from"].append(idx)
+                edges["to"].append(self._id_to_idx[neighbor_id])
+                edges["distance"].append(distance)
+                edges["time"].append(time)
         
-        with open(filename, 'w') as f:
-            json.dump(graph_data, f, indent=2)
+        if orjson is not None:
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(graph_data, option=orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            with open(filename, 'w') as f:
+                json.dump(graph_data, f, separators=(',', ':'))
     
     @classmethod
     def load_from_file(cls, filename: str) -> 'CityGraph':
         """
         Load a graph from a JSON file.
         
+        Reads the column layout written by save_to_file, building the coordinate
+        and CSR arrays in bulk. Files in the older per-node/per-edge dictionary
+        layout are still accepted.
+        
         Args:
             filename: Path to the file to load from
             
@@ -187,38 +603,100 @@ class CityGraph:
         if not os.path.exists(filename):
             raise FileNotFoundError(f"Graph file {filename} not found")
         
-        with open(filename, 'r') as f:
-            graph_data = json.load(f)
+        with open(filename, 'rb') as f:
+            raw = f.read()
+        graph_data = orjson.loads(raw) if orjson is not None else json.loads(raw)
         
         graph = cls()
         
+        if isinstance(graph_data["edges"], list):
+            # Legacy layout: dict of node records and a list of edge records
+            for node_id, node_data in graph_data["nodes"].items():
+                node = CityNode(
+                    node_id=node_data["id"],
+                    lat=node_data["lat"],
+                    lng=node_data["lng"],
+                    name=node_data["name"]
+                )
+                graph.add_node(node)
+            
+            # Build every neighbor dict first, then attach them in one pass
+            # (edges are directed here; the reverse edges have their own records)
+            nodes = graph.nodes
+            neighbors = defaultdict(dict)
+            for edge_data in graph_data["edges"]:
+                from_id = edge_data["from"]
+                to_id = edge_data["to"]
+                if from_id in nodes and to_id in nodes:
+                    neighbors[from_id][nodes[to_id].id] = (edge_data["distance"], edge_data["time"])
+            
+            for node_id, node in nodes.items():
+                node.neighbors = neighbors.get(node_id, {})
+            
+            return graph
+        
+        node_data = graph_data["nodes"]
+        edge_data = graph_data["edges"]
+        ids = [sys.intern(node_id) for node_id in node_data["ids"]]
+        
         # Load nodes
-        for node_id, node_data in graph_data["nodes"].items():
-            node = CityNode(
-                node_id=node_data["id"],
-                lat=node_data["lat"],
-                lng=node_data["lng"],
-                name=node_data["name"]
-            )
-            graph.add_node(node)
-        
-        # Load edges
-        for edge_data in graph_data["edges"]:
-            graph.add_edge(
-                node1_id=edge_data["from"],
-                node2_id=edge_data["to"],
-                distance=edge_data["distance"],
-                time=edge_data["time"],
-                bidirectional=False  # Don't create bidirectional edges when loading
-            )
+        for node_id, lat, lng, name in zip(ids, node_data["lats"], node_data["lngs"], node_data["names"]):
+            graph.nodes[node_id] = CityNode(node_id, lat, lng, name)
+        
+        # Load edges: build every neighbor dict first, then attach them in one pass
+        neighbors = defaultdict(dict)
+        for from_idx, to_idx, distance, time in zip(
+                edge_data["from"], edge_data["to"], edge_data["distance"], edge_data["time"]):
+            neighbors[from_idx][ids[to_idx]] = (distance, time)
+        
+        for idx, node in enumerate(graph.nodes.values()):
+            node.neighbors = neighbors.get(idx, {})
+        
+        # The columns already are the dense layout, so build the arrays directly
+        graph._ids = ids
+        graph._id_to_idx = {node_id: idx for idx, node_id in enumerate(graph._ids)}
+        graph._set_node_arrays(
+            np.radians(np.asarray(node_data["lats"], dtype=np.float64)),
+            np.radians(np.asarray(node_data["lngs"], dtype=np.float64))
+        )
+        graph._set_csr(edge_data["from"], edge_data["to"], edge_data["distance"], edge_data["time"])
         
         return graph
 
 
-def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+def _group_edges(keys: np.ndarray, others: np.ndarray, edge_dist: np.ndarray,
+                 edge_time: np.ndarray, count: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Group edge columns by one endpoint into CSR arrays.
+    
+    Args:
+        keys: Dense index of the endpoint to group by
+        others: Dense index of the opposite endpoint
+        edge_dist: Distance of each edge
+        edge_time: Time of each edge
+        count: Number of nodes
+        
+    Returns:
+        Tuple of (offsets, neighbor_idx, edge_dist, edge_time) in CSR order
+    """
+    # A stable sort keeps each node's edges in their original order
+    order = np.argsort(keys, kind='stable')
+    offsets = np.zeros(count + 1, dtype=np.int32)
+    np.cumsum(np.bincount(keys, minlength=count), out=offsets[1:])
+    
+    return offsets, others[order], edge_dist[order], edge_time[order]
+
+
+def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float,
+                       _rad=math.radians, _sin=math.sin, _cos=math.cos,
+                       _asin=math.asin, _sqrt=math.sqrt) -> float:
     """
     Calculate the great circle distance between two points on the earth.
     
+    Scalars take a math-only path with no NumPy dispatch; arrays fall back to
+    haversine_vector. The underscore-prefixed defaults bind the math functions
+    as locals; callers should not pass them.
+    
     Args:
         lat1: Latitude of point 1 in degrees
         lon1: Longitude of point 1 in degrees
@@ -226,20 +704,94 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
         lon2: Longitude of point 2 in degrees
         
     Returns:
-        Distance between the points in kilometers
+        Distance between the points in kilometers (an array for array input)
     """
-    # Convert latitude and longitude from degrees to radians
-    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
+    # Convert latitude and longitude from degrees to radians, into new locals so
+    # the array fallback still sees the arguments in degrees
+    try:
+        lat1_r = _rad(lat1)
+        lon1_r = _rad(lon1)
+        lat2_r = _rad(lat2)
+        lon2_r = _rad(lon2)
+    except TypeError:
+        # Array input: math only accepts scalars
+        return haversine_vector(np.radians(lat1), np.radians(lon1), np.radians(lat2), np.radians(lon2))
     
     # Haversine formula
-    dlon = lon2 - lon1
-    dlat = lat2 - lat1
-    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-    c = 2 * math.asin(math.sqrt(a))
+    s_lat = _sin((lat2_r - lat1_r) * 0.5)
+    s_lon = _sin((lon2_r - lon1_r) * 0.5)
+    a = s_lat * s_lat + _cos(lat1_r) * _cos(lat2_r) * s_lon * s_lon
+    c = 2 * _asin(_sqrt(a))
     r = 6371  # Radius of Earth in kilometers
     return c * r
 
 
+def haversine_distance_rad(lat1_r: float, cos_lat1: float, lng1_r: float,
+                           lat2_r: float, cos_lat2: float, lng2_r: float) -> float:
+    """
+    Calculate the great circle distance between two points from precomputed values.
+    
+    Same result as haversine_distance, but takes coordinates already converted to
+    radians together with the cosine of each latitude (see CityNode.lat_rad,
+    CityNode.lng_rad and CityNode.cos_lat), so no radians/cos calls are repeated.
+    
+    Args:
+        lat1_r: Latitude of point 1 in radians
+        cos_lat1: Cosine of the latitude of point 1
+        lng1_r: Longitude of point 1 in radians
+        lat2_r: Latitude of point 2 in radians
+        cos_lat2: Cosine of the latitude of point 2
+        lng2_r: Longitude of point 2 in radians
+        
+    Returns:
+        Distance between the points in kilometers
+    """
+    a = math.sin((lat2_r - lat1_r) / 2)**2 + cos_lat1 * cos_lat2 * math.sin((lng2_r - lng1_r) / 2)**2
+    return 2 * 6371 * math.asin(math.sqrt(a))
+
+
+def haversine_vector(lat_r, lng_r, lat_rad: np.ndarray, lng_rad: np.ndarray,
+                     cos_lat_r=None, cos_lat: np.ndarray = None) -> np.ndarray:
+    """
+    Calculate great circle distances for many points at once.
+    
+    Args:
+        lat_r: Latitude of the reference point(s) in radians (scalar or array)
+        lng_r: Longitude of the reference point(s) in radians (scalar or array)
+        lat_rad: Array of latitudes in radians
+        lng_rad: Array of longitudes in radians
+        cos_lat_r: Optional precomputed cosine of lat_r
+        cos_lat: Optional precomputed cosines of lat_rad (e.g. CityNode.cos_lat)
+        
+    Returns:
+        Array of distances in kilometers (broadcast over the inputs)
+    """
+    if cos_lat_r is None:
+        cos_lat_r = np.cos(lat_r)
+    if cos_lat is None:
+        cos_lat = np.cos(lat_rad)
+    
+    dlat = lat_rad - lat_r
+    dlng = lng_rad - lng_r
+    a = np.sin(dlat / 2) ** 2 + cos_lat_r * cos_lat * np.sin(dlng / 2) ** 2
+    return 2 * 6371 * np.arcsin(np.sqrt(a))
+
+
+def unit_sphere_xyz(lat_r, lng_r) -> np.ndarray:
+    """
+    Convert coordinates in radians to (x, y, z) points on the unit sphere.
+    
+    Args:
+        lat_r: Latitude (scalar or array) in radians
+        lng_r: Longitude (scalar or array) in radians
+        
+    Returns:
+        Array of shape (3,) for scalar input or (N, 3) for array input
+    """
+    cos_lat = np.cos(lat_r)
+    return np.stack((cos_lat * np.cos(lng_r), cos_lat * np.sin(lng_r), np.sin(lat_r)), axis=-1)
+
+
 def create_demo_city_graph() -> CityGraph:
     """
     Create a demo city graph representing a small part of a city.
@@ -5,13 +5,18 @@ This module provides algorithms for matching users with the most suitable driver
 based on various criteria including location, ETA, and driver characteristics.
 
 Time Complexity Analysis:
-- Finding Nearest Drivers: O(D log D) where D is the number of drivers
-  * Each driver distance calculation: O(1)
-  * Sorting drivers by distance: O(D log D)
+- Finding Nearest Drivers: O(log A + D_local + K log K) where A is the number of available
+  drivers and D_local the number of them within the search radius
+  * A KD-tree over the unit-sphere positions of available drivers answers the radius
+    query; it is rebuilt lazily (O(A log A)) only after the available set changes or
+    an available driver moves, so moving busy drivers costs nothing
+  * Candidates are ranked by float32 unit-sphere chord length in one SIMD pass: O(D_local)
+  * Top-K selection with argpartition, then exact haversine and sort of the K winners: O(D_local + K log K)
 
-- ETA Calculation: O(V log V) per driver, where V is the number of vertices in the graph
-  * Using A* for optimal routing: O((V + E) log V)
-  * Processing top K drivers: O(K * (V + E) log V)
+- ETA Calculation: O((V + E) log V) per request, where V is the number of vertices in the graph
+  * One all-to-one Dijkstra towards the pickup node over the reversed edges, memoized per pickup node
+  * Processing top K drivers: O(K) path lookups in that single search
+  * The ride distance used for the fare is computed once per request, not per driver
 
 Space Complexity:
 - O(D + V), where D is the number of drivers and V is the number of vertices in the graph
@@ -20,15 +25,25 @@ The algorithm uses a combination of spatial proximity and pathfinding to find
 the most suitable drivers for a user request.
 """
 
+import functools
 import heapq
+import itertools
 import math
 import time
 from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass
 from enum import Enum
 
-from .city_graph import CityGraph, CityNode, haversine_distance
-from .pathfinding import find_optimal_path
+import numpy as np
+from scipy.spatial import cKDTree
+
+try:
+    import simsimd
+except ImportError:
+    simsimd = None
+
+from .city_graph import CityGraph, CityNode, haversine_distance, unit_sphere_xyz
+from ._numba_kernels import EARTH_RADIUS_KM, haversine_all
+from .pathfinding import dijkstra_algorithm, find_optimal_path, get_path_details, reconstruct_path_to_target
 
 
 class DriverStatus(Enum):
@@ -40,9 +55,36 @@ class DriverStatus(Enum):
     ON_BREAK = "on_break"
 
 
-@dataclass
+# Compact integer codes for the driver arrays kept by DriverMatcher
+_STATUS_CODES = {status: code for code, status in enumerate(DriverStatus)}
+_AVAILABLE_CODE = _STATUS_CODES[DriverStatus.AVAILABLE]
+
+# Per-candidate scores used while ranking matches; rows reference candidates by
+# their position in the nearest-driver list
+MATCH_DTYPE = np.dtype([
+    ('driver_idx', np.int32),
+    ('direct', np.float64),
+    ('route_dist', np.float64),
+    ('eta', np.float64)
+])
+
+# Fare model: a base fare in rupees plus a per-km rate by vehicle type
+BASE_FARE = 50
+PER_KM_RATES = {
+    'mini': 12,
+    'sedan': 15,
+    'premium': 20,
+    'suv': 18,
+    'xl': 25
+}
+DEFAULT_PER_KM_RATE = PER_KM_RATES['sedan']
+
+
 class Driver:
     """Class representing a driver in the system."""
+    __slots__ = ('id', 'name', 'current_location', 'nearest_node_id', 'status',
+                 'vehicle_type', 'rating', 'total_trips')
+    
     id: str
     name: str
     current_location: Tuple[float, float]  # (lat, lng)
@@ -82,11 +124,17 @@ class Driver:
         self.vehicle_type = vehicle_type
         self.rating = rating
         self.total_trips = total_trips
+    
+    def __repr__(self):
+        return (f"Driver(id={self.id}, name={self.name}, current_location={self.current_location}, "
+                f"status={self.status.value}, vehicle_type={self.vehicle_type})")
 
 
-@dataclass
 class RideRequest:
     """Class representing a ride request from a user."""
+    __slots__ = ('id', 'user_id', 'pickup_location', 'pickup_node_id', 'dropoff_location',
+                 'dropoff_node_id', 'vehicle_type', 'timestamp')
+    
     id: str
     user_id: str
     pickup_location: Tuple[float, float]  # (lat, lng)
@@ -126,6 +174,10 @@ class RideRequest:
         self.dropoff_node_id = dropoff_node_id
         self.vehicle_type = vehicle_type
         self.timestamp = timestamp or time.time()
+    
+    def __repr__(self):
+        return (f"RideRequest(id={self.id}, user_id={self.user_id}, pickup={self.pickup_location}, "
+                f"dropoff={self.dropoff_location}, vehicle_type={self.vehicle_type})")
 
 
 class DriverMatcher:
@@ -140,6 +192,53 @@ class DriverMatcher:
         """
         self.city_graph = city_graph
         self.drivers = {}  # Dictionary of driver_id -> Driver
+        
+        # Per-instance memoization of shortest-path work. Keys include the graph
+        # version so that any change to the graph naturally misses the cache.
+        self._single_target = functools.lru_cache(maxsize=1024)(self._compute_single_target)
+        self._route_distance = functools.lru_cache(maxsize=1024)(self._compute_route_distance)
+        
+        # Structure-of-arrays mirror of the driver table, indexed by slot, so that
+        # distance filtering runs as a single vectorized pass over all drivers
+        self._drv_slot: Dict[str, int] = {}  # driver_id -> slot
+        self._drv_ids: List[str] = []
+        self._drv_count = 0
+        self._drv_lat = np.empty(0, dtype=np.float64)  # radians
+        self._drv_lng = np.empty(0, dtype=np.float64)  # radians
+        self._drv_cos_lat = np.empty(0, dtype=np.float64)
+        self._drv_xyz = np.empty((0, 3), dtype=np.float32)  # unit-sphere (x, y, z)
+        self._drv_status = np.empty(0, dtype=np.int8)  # _STATUS_CODES
+        self._drv_vtype = np.empty(0, dtype=np.int8)  # self._vtype_codes
+        self._vtype_codes: Dict[str, int] = {}  # vehicle_type -> int8 code
+        
+        # KD-tree over the unit-sphere positions of available drivers with the
+        # slot of each tree point, built on demand. Every change to the
+        # available set or its positions bumps the generation, which outdates
+        # the tree. Kept as one (generation, tree, slots) tuple so that a
+        # concurrent rebuild can never pair a tree with another tree's slots.
+        self._avail_generation = 0
+        self._avail_index: Optional[Tuple[int, Optional[cKDTree], np.ndarray]] = None
+    
+    def _grow_driver_arrays(self, min_capacity: int = 0):
+        """
+        Double the capacity of the driver arrays (or more, up to min_capacity).
+        
+        Args:
+            min_capacity: Minimum capacity after growing
+        """
+        capacity = max(16, 2 * len(self._drv_lat), min_capacity)
+        
+        def grow(arr):
+            grown = np.empty((capacity,) + arr.shape[1:], dtype=arr.dtype)
+            grown[:self._drv_count] = arr[:self._drv_count]
+            return grown
+        
+        self._drv_lat = grow(self._drv_lat)
+        self._drv_lng = grow(self._drv_lng)
+        self._drv_cos_lat = grow(self._drv_cos_lat)
+        self._drv_xyz = grow(self._drv_xyz)
+        self._drv_status = grow(self._drv_status)
+        self._drv_vtype = grow(self._drv_vtype)
     
     def add_driver(self, driver: Driver):
         """
@@ -156,6 +255,106 @@ class DriverMatcher:
             driver.nearest_node_id = nearest_node_id
         
         self.drivers[driver.id] = driver
+        
+        # Reuse the slot of a driver being re-added, otherwise append a new one
+        slot = self._drv_slot.get(driver.id)
+        if slot is None:
+            if self._drv_count == len(self._drv_lat):
+                self._grow_driver_arrays()
+            slot = self._drv_count
+            self._drv_count += 1
+            self._drv_slot[driver.id] = slot
+            self._drv_ids.append(driver.id)
+        
+        self._drv_lat[slot] = math.radians(driver.current_location[0])
+        self._drv_lng[slot] = math.radians(driver.current_location[1])
+        self._drv_cos_lat[slot] = math.cos(self._drv_lat[slot])
+        self._drv_xyz[slot] = unit_sphere_xyz(self._drv_lat[slot], self._drv_lng[slot])
+        self._drv_status[slot] = _STATUS_CODES[driver.status]
+        self._drv_vtype[slot] = self._vtype_codes.setdefault(driver.vehicle_type, len(self._vtype_codes))
+        self._invalidate_available_tree()
+    
+    def add_drivers(self, drivers: List[Driver]):
+        """
+        Add several drivers to the system at once.
+        
+        Same as calling add_driver for every driver, but the nearest nodes are
+        found in one query and the driver arrays are filled in vectorized passes.
+        
+        Args:
+            drivers: The drivers to add
+        """
+        # A driver listed twice keeps its first slot and its last entry, as
+        # with repeated add_driver calls
+        by_id = {}
+        for driver in drivers:
+            by_id[driver.id] = driver
+        drivers = list(by_id.values())
+        if not drivers:
+            return
+        
+        missing = [driver for driver in drivers if not driver.nearest_node_id]
+        if missing:
+            nearest_node_ids, _ = self.city_graph.get_nearest_nodes(
+                [driver.current_location[0] for driver in missing],
+                [driver.current_location[1] for driver in missing]
+            )
+            for driver, nearest_node_id in zip(missing, nearest_node_ids):
+                driver.nearest_node_id = nearest_node_id
+        
+        # Assign slots, growing the arrays at most once
+        new_count = sum(1 for driver in drivers if driver.id not in self._drv_slot)
+        if self._drv_count + new_count > len(self._drv_lat):
+            self._grow_driver_arrays(self._drv_count + new_count)
+        
+        slots = np.empty(len(drivers), dtype=np.intp)
+        for i, driver in enumerate(drivers):
+            self.drivers[driver.id] = driver
+            slot = self._drv_slot.get(driver.id)
+            if slot is None:
+                slot = self._drv_count
+                self._drv_count += 1
+                self._drv_slot[driver.id] = slot
+                self._drv_ids.append(driver.id)
+            slots[i] = slot
+        
+        # Fill the slot arrays in one pass
+        self._drv_lat[slots] = np.radians([driver.current_location[0] for driver in drivers])
+        self._drv_lng[slots] = np.radians([driver.current_location[1] for driver in drivers])
+        self._drv_cos_lat[slots] = np.cos(self._drv_lat[slots])
+        self._drv_xyz[slots] = unit_sphere_xyz(self._drv_lat[slots], self._drv_lng[slots])
+        self._drv_status[slots] = [_STATUS_CODES[driver.status] for driver in drivers]
+        self._drv_vtype[slots] = [
+            self._vtype_codes.setdefault(driver.vehicle_type, len(self._vtype_codes))
+            for driver in drivers
+        ]
+        self._invalidate_available_tree()
+    
+    def _invalidate_available_tree(self):
+        """Outdate the KD-tree of available drivers (after the driver arrays changed)."""
+        self._avail_generation += 1
+    
+    def _available_tree(self) -> Tuple[Optional[cKDTree], np.ndarray]:
+        """
+        Get the KD-tree of available drivers, building it if needed.
+        
+        Returns:
+            Tuple of (tree, slots): the tree over the unit-sphere positions of
+            the available drivers (None if there are none) and the driver slot
+            of each tree point
+        """
+        generation = self._avail_generation
+        index = self._avail_index
+        if index is None or index[0] != generation:
+            slots = np.flatnonzero(self._available_mask())
+            tree = cKDTree(self._drv_xyz[slots].astype(np.float64)) if len(slots) else None
+            index = (generation, tree, slots)
+            # A tree built while the drivers changed may be stale: it serves
+            # this query but is not kept
+            if self._avail_generation == generation:
+                self._avail_index = index
+        
+        return index[1], index[2]
     
     def update_driver_location(self, driver_id: str, location: Tuple[float, float]):
         """
@@ -173,6 +372,13 @@ class DriverMatcher:
         
         # Update location
         self.drivers[driver_id].current_location = location
+        slot = self._drv_slot[driver_id]
+        self._drv_lat[slot] = math.radians(location[0])
+        self._drv_lng[slot] = math.radians(location[1])
+        self._drv_cos_lat[slot] = math.cos(self._drv_lat[slot])
+        self._drv_xyz[slot] = unit_sphere_xyz(self._drv_lat[slot], self._drv_lng[slot])
+        if self._drv_status[slot] == _AVAILABLE_CODE:
+            self._invalidate_available_tree()
         
         # Update nearest node
         nearest_node_id, _ = self.city_graph.get_nearest_node(location[0], location[1])
@@ -180,6 +386,41 @@ class DriverMatcher:
         
         return True
     
+    def update_driver_locations(self, driver_ids: List[str], lats, lngs):
+        """
+        Update the locations of several drivers at once.
+        
+        Same as calling update_driver_location for every driver, but the
+        coordinate arrays and nearest nodes are computed in vectorized passes.
+        Unknown driver IDs are skipped.
+        
+        Args:
+            driver_ids: IDs of the drivers to update
+            lats: New latitude of each driver
+            lngs: New longitude of each driver
+        """
+        known = [i for i, driver_id in enumerate(driver_ids) if driver_id in self.drivers]
+        if not known:
+            return
+        
+        lats = np.asarray(lats, dtype=np.float64)[known]
+        lngs = np.asarray(lngs, dtype=np.float64)[known]
+        slots = np.array([self._drv_slot[driver_ids[i]] for i in known], dtype=np.intp)
+        
+        # Update the slot arrays in one pass
+        self._drv_lat[slots] = np.radians(lats)
+        self._drv_lng[slots] = np.radians(lngs)
+        self._drv_cos_lat[slots] = np.cos(self._drv_lat[slots])
+        self._drv_xyz[slots] = unit_sphere_xyz(self._drv_lat[slots], self._drv_lng[slots])
+        if np.any(self._drv_status[slots] == _AVAILABLE_CODE):
+            self._invalidate_available_tree()
+        nearest_node_ids, _ = self.city_graph.get_nearest_nodes(lats, lngs)
+        
+        for i, lat, lng, nearest_node_id in zip(known, lats.tolist(), lngs.tolist(), nearest_node_ids):
+            driver = self.drivers[driver_ids[i]]
+            driver.current_location = (lat, lng)
+            driver.nearest_node_id = nearest_node_id
+
     def update_driver_status(self, driver_id: str, status: str):
         """
         Update a driver's status.
@@ -196,6 +437,12 @@ class DriverMatcher:
         
         try:
             self.drivers[driver_id].status = DriverStatus(status)
+            slot = self._drv_slot[driver_id]
+            code = _STATUS_CODES[self.drivers[driver_id].status]
+            changed = (code == _AVAILABLE_CODE) != (self._drv_status[slot] == _AVAILABLE_CODE)
+            self._drv_status[slot] = code
+            if changed:
+                self._invalidate_available_tree()
             return True
         except ValueError:
             return False
@@ -224,6 +471,37 @@ class DriverMatcher:
         
         return request
     
+    def prepare_ride_requests(self, requests: List[RideRequest]) -> List[RideRequest]:
+        """
+        Prepare several ride requests at once.
+        
+        Same as calling prepare_ride_request for every request, but the nearest
+        nodes of all pickups and dropoffs are found in one query.
+        
+        Args:
+            requests: The ride requests to prepare
+        
+        Returns:
+            The prepared ride requests
+        """
+        # (request, attribute to set, location) for every node still missing
+        lookups = []
+        for request in requests:
+            if not request.pickup_node_id:
+                lookups.append((request, 'pickup_node_id', request.pickup_location))
+            if not request.dropoff_node_id and request.dropoff_location:
+                lookups.append((request, 'dropoff_node_id', request.dropoff_location))
+        
+        if lookups:
+            node_ids, _ = self.city_graph.get_nearest_nodes(
+                [location[0] for _, _, location in lookups],
+                [location[1] for _, _, location in lookups]
+            )
+            for (request, attribute, _), node_id in zip(lookups, node_ids):
+                setattr(request, attribute, node_id)
+        
+        return requests
+    
     def get_available_drivers(self, vehicle_type: str = None) -> List[Driver]:
         """
         Get all available drivers, optionally filtered by vehicle type.
@@ -234,14 +512,32 @@ class DriverMatcher:
         Returns:
             List of available drivers
         """
-        available_drivers = []
+        mask = self._available_mask(vehicle_type)
         
-        for driver in self.drivers.values():
-            if driver.status == DriverStatus.AVAILABLE:
-                if vehicle_type is None or driver.vehicle_type == vehicle_type:
-                    available_drivers.append(driver)
+        return [self.drivers[self._drv_ids[slot]] for slot in np.flatnonzero(mask)]
+    
+    def _available_mask(self, vehicle_type: str = None, slots: np.ndarray = None) -> np.ndarray:
+        """
+        Build a boolean mask over driver slots of available drivers.
         
-        return available_drivers
+        Args:
+            vehicle_type: Optional vehicle type to filter by
+            slots: Optional array of slots to restrict the mask to
+        
+        Returns:
+            Boolean array with one entry per driver slot (per entry of slots if given)
+        """
+        if slots is None:
+            slots = slice(0, self._drv_count)
+        mask = self._drv_status[slots] == _AVAILABLE_CODE
+        
+        if vehicle_type is not None:
+            vtype_code = self._vtype_codes.get(vehicle_type)
+            if vtype_code is None:
+                return np.zeros(len(mask), dtype=bool)
+            mask &= self._drv_vtype[slots] == vtype_code
+        
+        return mask
     
     def find_nearest_drivers(self, location: Tuple[float, float], 
                             max_count: int = 5, 
@@ -259,23 +555,93 @@ class DriverMatcher:
         Returns:
             List of (driver, distance) tuples, sorted by distance
         """
-        available_drivers = self.get_available_drivers(vehicle_type)
-        drivers_with_distance = []
+        if max_count <= 0:
+            return []
+        
+        tree, avail_slots = self._available_tree()
+        if tree is None:
+            return []
+        
+        lat_r = math.radians(location[0])
+        lng_r = math.radians(location[1])
+        
+        # Radius query on the unit sphere: a great-circle distance d is a chord
+        # of 2 sin(d / 2R). The radius is padded by ~6 m to cover the float32
+        # positions, so that the exact filters below decide borderline drivers.
+        query = unit_sphere_xyz(lat_r, lng_r)
+        max_chord = 2 * math.sin(min(max_distance / (2 * EARTH_RADIUS_KM), math.pi / 2))
+        points = np.asarray(tree.query_ball_point(query, max_chord + 1e-6), dtype=np.intp)
+        candidates = avail_slots[np.sort(points)]
+        
+        if vehicle_type is not None:
+            candidates = candidates[self._available_mask(vehicle_type, candidates)]
+        if len(candidates) == 0:
+            return []
+        
+        # Rank the surviving candidates by squared chord length between float32
+        # unit vectors, which is monotonic in the great-circle distance
+        sq_chords = _squared_distances(query.astype(np.float32), self._drv_xyz[candidates])
+        within = sq_chords <= max_chord * max_chord
+        candidates = candidates[within]
+        sq_chords = sq_chords[within]
+        
+        # Select the top max_count in O(D) with argpartition (slot order kept)
+        if len(candidates) > max_count:
+            top = np.sort(np.argpartition(sq_chords, max_count - 1)[:max_count])
+            candidates = candidates[top]
+        
+        # Exact distances for the K winners only; the float32 filter above is
+        # accurate to well under a metre, so recheck the limit exactly
+        distances = haversine_all(
+            lat_r, lng_r,
+            self._drv_lat[candidates], self._drv_lng[candidates], self._drv_cos_lat[candidates]
+        )
+        order = np.argsort(distances, kind='stable')
         
-        for driver in available_drivers:
-            distance = haversine_distance(
-                location[0], location[1], 
-                driver.current_location[0], driver.current_location[1]
-            )
-            
-            if distance <= max_distance:
-                drivers_with_distance.append((driver, distance))
+        return [
+            (self.drivers[self._drv_ids[candidates[i]]], float(distances[i]))
+            for i in order
+            if distances[i] <= max_distance
+        ]
+    
+    def _compute_single_target(self, target_id: str, cost_type: str,
+                               graph_version: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Run an all-to-one Dijkstra search to a node (memoized via self._single_target).
+        
+        The search follows edges backwards from the target, so one run yields
+        the shortest path from every node to it.
         
-        # Sort by distance
-        drivers_with_distance.sort(key=lambda x: x[1])
+        Args:
+            target_id: ID of the target node
+            cost_type: 'time' or 'distance'
+            graph_version: Version of the city graph, used only as part of the cache key
         
-        # Limit to max_count
-        return drivers_with_distance[:max_count]
+        Returns:
+            Tuple of (costs, successors) indexed by city_graph.node_index: the cost
+            of every node to the target, and the index of its next hop towards
+            the target (-1 if none)
+        """
+        return dijkstra_algorithm(self.city_graph, target_id, None, cost_type, reverse=True)
+    
+    def _compute_route_distance(self, pickup_node_id: str, dropoff_node_id: str,
+                                graph_version: int) -> float:
+        """
+        Compute the road distance of a ride (memoized via self._route_distance).
+        
+        Args:
+            pickup_node_id: ID of the pickup node
+            dropoff_node_id: ID of the dropoff node
+            graph_version: Version of the city graph, used only as part of the cache key
+        
+        Returns:
+            Shortest path distance in kilometers
+        """
+        path_details = find_optimal_path(
+            self.city_graph, pickup_node_id, dropoff_node_id,
+            algorithm='a_star', cost_type='distance'
+        )
+        return path_details['total_distance']
     
     def calculate_driver_eta(self, driver: Driver, pickup_node_id: str) -> Dict:
         """
@@ -288,11 +654,15 @@ class DriverMatcher:
         Returns:
             Dictionary with path details
         """
-        # Find the path from driver to pickup
-        path_details = find_optimal_path(
-            self.city_graph, driver.nearest_node_id, pickup_node_id, 
-            algorithm='a_star', cost_type='time'
-        )
+        # Find the path from driver to pickup using the (cached) all-to-one search
+        # towards the pickup node, shared by every candidate driver of a request
+        single_target = self._single_target(pickup_node_id, 'time', self.city_graph.version)
+        path = reconstruct_path_to_target(self.city_graph, single_target[1],
+                                          driver.nearest_node_id, pickup_node_id)
+        
+        path_details = get_path_details(self.city_graph, path)
+        path_details["algorithm"] = 'dijkstra'
+        path_details["cost_type"] = 'time'
         
         # Add the direct distance from driver's current location to their nearest node
         if driver.nearest_node_id in self.city_graph.nodes:
@@ -335,16 +705,32 @@ class DriverMatcher:
             vehicle_type=request.vehicle_type
         )
         
-        matched_drivers = []
+        # The fare only depends on the ride itself, so it is computed once per
+        # request rather than once per candidate driver
+        estimated_fare = self.estimate_fare(
+            request, self.calculate_ride_distance(request), _surge_factor_for_now()
+        )
+        
+        # Score every candidate into one flat record buffer
+        scores = np.empty(len(nearest_drivers), dtype=MATCH_DTYPE)
         
-        for driver, direct_distance in nearest_drivers:
+        for i, (driver, direct_distance) in enumerate(nearest_drivers):
             # Calculate ETA
             eta_details = self.calculate_driver_eta(driver, request.pickup_node_id)
-            
-            # Estimate fare
-            estimated_fare = self.estimate_fare(request, eta_details)
-            
-            # Add driver to results
+            scores[i] = (
+                i,
+                round(direct_distance, 2),
+                eta_details['total_distance'],
+                math.ceil(eta_details['total_time'])
+            )
+        
+        # Sort by ETA; a stable sort keeps nearer drivers first on ties
+        scores = scores[np.argsort(scores['eta'], kind='stable')]
+        
+        # Only the ranked results are turned into dicts
+        matched_drivers = []
+        for driver_idx, direct, route_dist, eta in scores.tolist():
+            driver = nearest_drivers[driver_idx][0]
             matched_drivers.append({
                 'driver': {
                     'id': driver.id,
@@ -354,64 +740,113 @@ class DriverMatcher:
                     'total_trips': driver.total_trips,
                     'current_location': driver.current_location
                 },
-                'direct_distance': round(direct_distance, 2),
-                'route_distance': eta_details['total_distance'],
-                'eta_minutes': math.ceil(eta_details['total_time']),
+                'direct_distance': direct,
+                'route_distance': route_dist,
+                'eta_minutes': int(eta),
                 'estimated_fare': estimated_fare
             })
         
-        # Sort by ETA
-        matched_drivers.sort(key=lambda x: x['eta_minutes'])
-        
         return matched_drivers
     
-    def estimate_fare(self, request: RideRequest, eta_details: Dict) -> float:
+    def calculate_ride_distance(self, request: RideRequest) -> float:
+        """
+        Calculate the road distance from pickup to dropoff for a ride request.
+        
+        Args:
+            request: The ride request
+        
+        Returns:
+            Ride distance in kilometers
+        """
+        if request.pickup_node_id and request.dropoff_node_id:
+            # Distances repeat heavily for common pickup/dropoff pairs
+            return self._route_distance(
+                request.pickup_node_id, request.dropoff_node_id, self.city_graph.version
+            )
+        
+        # If no dropoff specified, use a placeholder distance
+        return 5.0  # Default 5km
+    
+    def estimate_fare(self, request: RideRequest, ride_distance: float = None,
+                      surge: float = None) -> float:
         """
         Estimate the fare for a ride.
         
         Args:
             request: The ride request
-            eta_details: ETA details including distance and time
+            ride_distance: Pickup to dropoff distance in kilometers; calculated
+                from the request if not given
+            surge: Time of day surge factor; looked up for the current time if
+                not given
         
         Returns:
             Estimated fare
         """
-        # Simple fare calculation
-        base_fare = 50  # Base fare in rupees
-        
         # Different rates based on vehicle type
-        per_km_rate = {
-            'mini': 12,
-            'sedan': 15,
-            'premium': 20,
-            'suv': 18,
-            'xl': 25
-        }.get(request.vehicle_type.lower(), 15)  # Default to sedan rate
-        
-        # Calculate ride distance (if dropoff is specified)
-        ride_distance = 0
-        if request.pickup_node_id and request.dropoff_node_id:
-            # Find the path details
-            path_details = find_optimal_path(
-                self.city_graph, request.pickup_node_id, request.dropoff_node_id,
-                algorithm='a_star', cost_type='distance'
-            )
-            ride_distance = path_details['total_distance']
-        else:
-            # If no dropoff specified, use a placeholder distance
-            ride_distance = 5.0  # Default 5km
+        per_km_rate = PER_KM_RATES.get(request.vehicle_type.lower(), DEFAULT_PER_KM_RATE)
+        
+        if ride_distance is None:
+            ride_distance = self.calculate_ride_distance(request)
         
         # Calculate fare
-        estimated_fare = base_fare + (ride_distance * per_km_rate)
+        estimated_fare = BASE_FARE + (ride_distance * per_km_rate)
         
         # Apply time of day surge factor (example: 1.5x during peak hours)
-        current_hour = time.localtime().tm_hour
-        if (current_hour >= 8 and current_hour <= 10) or (current_hour >= 17 and current_hour <= 19):
-            estimated_fare *= 1.5
+        if surge is None:
+            surge = _surge_factor_for_now()
+        estimated_fare *= surge
         
         return round(estimated_fare, 2)
 
 
+def _surge_factor_for_now() -> float:
+    """
+    Get the time of day surge factor for the current time.
+    
+    Returns:
+        1.5 during peak hours, 1.0 otherwise
+    """
+    # The local time is only converted once per minute
+    return _surge_factor_for_minute(int(time.time() // 60))
+
+
+@functools.lru_cache(maxsize=1)
+def _surge_factor_for_minute(minute: int) -> float:
+    """
+    Get the surge factor for a minute since the epoch (memoized).
+    
+    Args:
+        minute: Minutes since the epoch
+    
+    Returns:
+        1.5 during peak hours, 1.0 otherwise
+    """
+    current_hour = time.localtime(minute * 60).tm_hour
+    if (current_hour >= 8 and current_hour <= 10) or (current_hour >= 17 and current_hour <= 19):
+        return 1.5
+    return 1.0
+
+
+def _squared_distances(query: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """
+    Squared Euclidean distance from one point to each of many points.
+    
+    Uses SimSIMD's runtime-dispatched SIMD kernels when it is installed.
+    
+    Args:
+        query: float32 array of shape (3,)
+        points: float32 array of shape (N, 3)
+    
+    Returns:
+        Array of N squared distances
+    """
+    if simsimd is not None and len(points):
+        return np.asarray(simsimd.cdist(query[None, :], points, metric='sqeuclidean')).ravel()
+    
+    diff = points - query
+    return np.einsum('ij,ij->i', diff, diff)
+
+
 def create_demo_drivers(city_graph: CityGraph) -> List[Driver]:
     """
     Create demo drivers in the city.
@@ -438,10 +873,13 @@ def create_demo_drivers(city_graph: CityGraph) -> List[Driver]:
     
     drivers = []
     
-    for i, location in enumerate(driver_locations):
-        # Get the nearest node
-        nearest_node_id, _ = city_graph.get_nearest_node(location[0], location[1])
-        
+    # Snap every location to its nearest node in one batch query
+    nearest_node_ids, _ = city_graph.get_nearest_nodes(
+        [location[0] for location in driver_locations],
+        [location[1] for location in driver_locations]
+    )
+    
+    for i, (location, nearest_node_id) in enumerate(zip(driver_locations, nearest_node_ids)):
         # Create a driver
         driver = Driver(
             id=f"driver-{i+1:03d}",
@@ -459,6 +897,10 @@ def create_demo_drivers(city_graph: CityGraph) -> List[Driver]:
     return drivers
 
 
+# IDs of simulated requests; a counter cannot collide like a seconds timestamp
+_simulated_request_ids = itertools.count(1)
+
+
 def simulate_ride_request(pickup_lat: float, pickup_lng: float,
                          dropoff_lat: float, dropoff_lng: float,
                          vehicle_type: str = 'sedan') -> RideRequest:
@@ -476,7 +918,7 @@ def simulate_ride_request(pickup_lat: float, pickup_lng: float,
         Simulated ride request
     """
     return RideRequest(
-        id=f"request-{int(time.time())}",
+        id=f"request-{next(_simulated_request_ids)}",
         user_id="user-001",
         pickup_location=(pickup_lat, pickup_lng),
         dropoff_location=(dropoff_lat, dropoff_lng),
@@ -6,95 +6,176 @@ for finding optimal paths in a city graph.
 
 Time Complexity Analysis:
 - Dijkstra's Algorithm: O((V + E) log V), where V is the number of vertices and E is the number of edges
-  * Using a priority queue (binary heap): O(E log V)
-  * While loop iterations: O(V)
+  * Runs in SciPy's compiled csgraph.dijkstra over a sparse adjacency matrix
+  * Always computes the distances from the start to every node
   * Total: O((V + E) log V)
 
+- Batched Dijkstra (K sources): O(K (V + E) log V) in one compiled SciPy call;
+  many-to-one queries (find_optimal_paths_batch) need a single reverse search
+
+- Bidirectional Dijkstra: O((V + E) log V) in the worst case, but each search only
+  grows to about half the start-goal distance, so far fewer nodes are settled
+
 - A* Algorithm: O((V + E) log V) in the worst case, but typically faster than Dijkstra in practice
   due to the heuristic guiding the search toward the goal
+  * Heuristic: the larger of the straight-line estimate and the landmark (ALT)
+    lower bound, from costs precomputed once per graph (CityGraph.get_landmark_distances)
 
 Space Complexity:
 - Both algorithms: O(V) for storing distances, visited nodes, and the priority queue
 
+Both algorithms work on the graph's CSR adjacency (see CityGraph.get_csr and
+CityGraph.to_csr) rather than the per-node neighbor dictionaries. When numba is
+installed, A* and point-to-point Dijkstra run as JIT-compiled kernels (see
+_numba_kernels); the Python implementations are the fallback.
+
 The A* algorithm is more efficient for point-to-point pathfinding as it uses
 a heuristic to guide the search toward the destination.
+
+find_optimal_path memoizes its results in one LRU cache shared by all graphs
+(keyed on the graph and its version), so a repeated query for a popular
+origin-destination pair costs a cache lookup and a copy of the result.
 """
 
 import heapq
+import itertools
+import threading
+import weakref
+from collections import OrderedDict, deque
 from typing import Dict, List, Tuple, Set, Optional
 import math
 
-from .city_graph import CityGraph, CityNode, haversine_distance
+import numpy as np
+from scipy.sparse.csgraph import dijkstra as csgraph_dijkstra
+
+from .city_graph import CityGraph, CityNode, haversine_distance_rad
+from ._numba_kernels import NUMBA_AVAILABLE, a_star_csr, dijkstra_csr, haversine_all
+
+# Number of find_optimal_path results remembered (across all graphs)
+PATH_CACHE_SIZE = 4096
+
+# A* heuristic cost per kilometer of straight-line distance, by cost type
+# ('time' assumes an average speed of 30 km/h, i.e. 2 minutes per km)
+HEURISTIC_SCALE = {'distance': 1.0, 'time': 2.0}
+
+# (graph token, graph version, start_id, goal_id, algorithm, cost_type) -> path
+# details, least recently used first (see find_optimal_path)
+_path_cache = OrderedDict()
+_path_cache_lock = threading.Lock()
+
+# city graph -> unique token identifying it in the _path_cache keys; unlike
+# id(graph), a token is never reused by a later graph
+_graph_tokens = weakref.WeakKeyDictionary()
+_next_graph_token = itertools.count()
 
 
 def dijkstra_algorithm(graph: CityGraph, start_id: str, goal_id: str, 
-                      cost_type: str = 'time') -> Tuple[Dict[str, float], Dict[str, str]]:
+                      cost_type: str = 'time', reverse: bool = False) -> Tuple[np.ndarray, np.ndarray]:
     """
     Dijkstra's algorithm for finding the shortest path in a graph.
     
     Args:
         graph: The city graph
         start_id: ID of the starting node
-        goal_id: ID of the goal node
+        goal_id: ID of the goal node, or None to search the whole graph. With
+            numba installed the search stops once the goal is settled (costs of
+            nodes not yet settled are then only upper bounds); otherwise the
+            whole graph is always searched
         cost_type: 'time' or 'distance' to optimize for
+        reverse: If True, follow edges backwards, so the search finds the
+            shortest paths from every node *to* start_id
         
     Returns:
-        Tuple of (distances, predecessors):
-            distances: Dictionary mapping node IDs to the shortest distance from start
-            predecessors: Dictionary mapping node IDs to their predecessor in the shortest path
+        Tuple of (distances, predecessors), both indexed by graph.node_index:
+            distances: float64[V] shortest distance from start (to start when
+                reverse is True), inf if unreachable
+            predecessors: int32[V] index of each node's predecessor in the shortest
+                path (its next hop towards start when reverse is True), -1 if none
     """
     # Validate cost_type
     if cost_type not in ['time', 'distance']:
         raise ValueError("cost_type must be 'time' or 'distance'")
     
-    # Get the cost index (0 for distance, 1 for time)
-    cost_index = 0 if cost_type == 'distance' else 1
+    id_to_idx = graph.node_index
+    start_idx = id_to_idx.get(start_id)
+    if start_idx is None:
+        return np.full(len(id_to_idx), np.inf), np.full(len(id_to_idx), -1, dtype=np.int32)
     
-    # Initialize data structures
-    distances = {node_id: float('inf') for node_id in graph.get_nodes()}
-    distances[start_id] = 0
-    predecessors = {node_id: None for node_id in graph.get_nodes()}
-    priority_queue = [(0, start_id)]  # (cost, node_id)
-    visited = set()
+    goal_idx = id_to_idx.get(goal_id) if goal_id is not None else None
+    return _dijkstra_search(graph, start_idx, goal_idx, cost_type, reverse)
+
+
+def _dijkstra_search(graph: CityGraph, start_idx: int, goal_idx: Optional[int],
+                     cost_type: str, reverse: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Run Dijkstra's algorithm on dense node indices (see dijkstra_algorithm).
     
-    while priority_queue:
-        # Get the node with the smallest distance
-        current_distance, current_id = heapq.heappop(priority_queue)
-        
-        # Skip if we've already processed this node
-        if current_id in visited:
-            continue
-        
-        # Mark as visited
-        visited.add(current_id)
-        
-        # If we've reached the goal, we can stop
-        if current_id == goal_id:
-            break
+    Args:
+        graph: The city graph
+        start_idx: Dense index of the starting node
+        goal_idx: Dense index of the goal node, or None to search the whole graph
+        cost_type: 'time' or 'distance' to optimize for
+        reverse: If True, follow edges backwards
         
-        # Get the current node
-        current_node = graph.get_node(current_id)
-        if not current_node:
-            continue
+    Returns:
+        Tuple of (distances, predecessors) as returned by dijkstra_algorithm
+    """
+    if NUMBA_AVAILABLE and goal_idx is not None:
+        # Point-to-point: the JIT kernel can stop as soon as the goal is settled
+        offsets, neighbor_idx, _, _, _, _ = graph.get_reverse_csr() if reverse else graph.get_csr()
+        weights = graph.get_edge_weights(cost_type, reverse)
+        return dijkstra_csr(offsets, neighbor_idx, weights, start_idx, goal_idx)
+    
+    # SciPy's compiled Dijkstra over the sparse adjacency matrix
+    distances, predecessors = csgraph_dijkstra(graph.to_csr(cost_type, reverse), directed=True,
+                                               indices=start_idx, return_predecessors=True)
+    predecessors[predecessors < 0] = -1  # SciPy marks "no predecessor" with -9999
+    
+    return distances, predecessors
+
+
+def dijkstra_algorithm_batch(graph: CityGraph, start_ids: List[str], cost_type: str = 'time',
+                             reverse: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Dijkstra's algorithm from several start nodes in one call.
+    
+    All sources go to SciPy's csgraph.dijkstra at once, so the loop over them
+    runs in compiled code over a single sparse matrix.
+    
+    Args:
+        graph: The city graph
+        start_ids: IDs of the starting nodes
+        cost_type: 'time' or 'distance' to optimize for
+        reverse: If True, follow edges backwards (shortest paths *to* each start)
         
-        # Explore neighbors
-        for neighbor_id, (distance, time) in current_node.neighbors.items():
-            cost = distance if cost_type == 'distance' else time
-            
-            # Calculate new distance
-            new_distance = distances[current_id] + cost
-            
-            # If this path is better, update it
-            if new_distance < distances[neighbor_id]:
-                distances[neighbor_id] = new_distance
-                predecessors[neighbor_id] = current_id
-                heapq.heappush(priority_queue, (new_distance, neighbor_id))
+    Returns:
+        Tuple of (distances, predecessors), [K, V] arrays whose row k is the
+        result of dijkstra_algorithm(graph, start_ids[k], None, cost_type, reverse);
+        rows of unknown start IDs are all inf / -1
+    """
+    # Validate cost_type
+    if cost_type not in ['time', 'distance']:
+        raise ValueError("cost_type must be 'time' or 'distance'")
+    
+    id_to_idx = graph.node_index
+    count = len(graph.node_ids)
+    distances = np.full((len(start_ids), count), np.inf)
+    predecessors = np.full((len(start_ids), count), -1, dtype=np.int32)
+    
+    rows = [k for k, start_id in enumerate(start_ids) if start_id in id_to_idx]
+    if rows:
+        indices = np.array([id_to_idx[start_ids[k]] for k in rows], dtype=np.int32)
+        dist, pred = csgraph_dijkstra(graph.to_csr(cost_type, reverse), directed=True,
+                                      indices=indices, return_predecessors=True)
+        pred[pred < 0] = -1  # SciPy marks "no predecessor" with -9999
+        distances[rows] = dist
+        predecessors[rows] = pred
     
     return distances, predecessors
 
 
 def a_star_algorithm(graph: CityGraph, start_id: str, goal_id: str, 
-                    cost_type: str = 'time') -> Tuple[Dict[str, float], Dict[str, str]]:
+                    cost_type: str = 'time') -> Tuple[np.ndarray, np.ndarray]:
     """
     A* algorithm for finding the shortest path in a graph.
     
@@ -105,83 +186,231 @@ def a_star_algorithm(graph: CityGraph, start_id: str, goal_id: str,
         cost_type: 'time' or 'distance' to optimize for
         
     Returns:
-        Tuple of (g_scores, predecessors):
-            g_scores: Dictionary mapping node IDs to the cost from start
-            predecessors: Dictionary mapping node IDs to their predecessor in the shortest path
+        Tuple of (g_scores, predecessors), both indexed by graph.node_index:
+            g_scores: float64[V] cost from start, inf if not reached
+            predecessors: int32[V] index of each node's predecessor in the shortest path, -1 if none
     """
     # Validate cost_type
     if cost_type not in ['time', 'distance']:
         raise ValueError("cost_type must be 'time' or 'distance'")
     
-    # Get the cost index (0 for distance, 1 for time)
-    cost_index = 0 if cost_type == 'distance' else 1
-    
-    # Get the goal node to calculate heuristics
-    goal_node = graph.get_node(goal_id)
-    if not goal_node:
+    id_to_idx = graph.node_index
+    if goal_id not in id_to_idx:
         raise ValueError(f"Goal node {goal_id} not found in graph")
-    
-    # Initialize data structures
-    g_scores = {node_id: float('inf') for node_id in graph.get_nodes()}
-    g_scores[start_id] = 0
-    f_scores = {node_id: float('inf') for node_id in graph.get_nodes()}
-    
-    # Calculate initial f_score for start node (g_score + heuristic)
-    start_node = graph.get_node(start_id)
-    if not start_node:
+    if start_id not in id_to_idx:
         raise ValueError(f"Start node {start_id} not found in graph")
     
-    # Calculate heuristic for the start node
-    heuristic = calculate_heuristic(start_node, goal_node, cost_type)
-    f_scores[start_id] = heuristic
+    return _a_star_search(graph, id_to_idx[start_id], id_to_idx[goal_id], cost_type)
+
+
+def _a_star_search(graph: CityGraph, start_idx: int, goal_idx: int,
+                   cost_type: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Run A* on dense node indices (see a_star_algorithm).
     
-    # Initialize other data structures
-    predecessors = {node_id: None for node_id in graph.get_nodes()}
-    priority_queue = [(f_scores[start_id], start_id)]  # (f_score, node_id)
+    Args:
+        graph: The city graph
+        start_idx: Dense index of the starting node
+        goal_idx: Dense index of the goal node
+        cost_type: 'time' or 'distance' to optimize for
+        
+    Returns:
+        Tuple of (g_scores, predecessors) as returned by a_star_algorithm
+    """
+    # Flattened (CSR) adjacency of the graph, with the weights of this cost type
+    offsets, neighbor_idx, _, _, ids, _ = graph.get_csr()
+    weights = graph.get_edge_weights(cost_type)
+    lat_rad, lng_rad, cos_lat = graph.get_coordinate_arrays()
+    h_scale = HEURISTIC_SCALE[cost_type]
+    lm_from, lm_to = graph.get_landmark_distances(cost_type)
+    
+    if NUMBA_AVAILABLE:
+        # JIT-compiled search with the heuristic inlined
+        return a_star_csr(offsets, neighbor_idx, weights, lat_rad, lng_rad, cos_lat,
+                          start_idx, goal_idx, h_scale, lm_from, lm_to)
+    
+    # Initialize data structures; only nodes the search reaches get an entry,
+    # so a query that stops early never touches most of the graph
+    g_scores = {start_idx: 0}
+    predecessors = {start_idx: -1}
+    
+    # The heuristic depends only on the node and the goal, so compute it for
+    # every node in one vectorized pass: straight-line distance to the goal,
+    # scaled to the cost type, raised to the landmark lower bound
+    heuristics = haversine_all(lat_rad[goal_idx], lng_rad[goal_idx], lat_rad, lng_rad, cos_lat)
+    heuristics *= h_scale
+    if len(lm_from):
+        with np.errstate(invalid='ignore'):
+            # inf - inf gives NaN where a landmark reaches neither node; fmax skips it
+            bounds = np.fmax(lm_from[:, goal_idx, None] - lm_from, lm_to - lm_to[:, goal_idx, None])
+        np.fmax(heuristics, np.fmax.reduce(bounds, axis=0), out=heuristics)
+    heuristics = heuristics.tolist()
+    
+    priority_queue = [(heuristics[start_idx], start_idx)]  # (f_score, node index)
     visited = set()
     
+    # Local bindings for the names used in the loop
+    push, pop = heapq.heappush, heapq.heappop
+    get_g, inf = g_scores.get, math.inf
+    
     while priority_queue:
         # Get the node with the smallest f_score
-        _, current_id = heapq.heappop(priority_queue)
+        _, current = pop(priority_queue)
         
-        # Skip if we've already processed this node
-        if current_id in visited:
+        # Skip if we've already processed this node; the heuristic need not be
+        # consistent, so expanded nodes are tracked rather than inferred from
+        # stale keys (and, as in the JIT kernel, never reopened)
+        if current in visited:
             continue
         
         # Mark as visited
-        visited.add(current_id)
+        visited.add(current)
         
         # If we've reached the goal, we can stop
-        if current_id == goal_id:
+        if current == goal_idx:
             break
         
-        # Get the current node
-        current_node = graph.get_node(current_id)
-        if not current_node:
-            continue
-        
         # Explore neighbors
-        for neighbor_id, (distance, time) in current_node.neighbors.items():
-            cost = distance if cost_type == 'distance' else time
-            
+        current_g = g_scores[current]
+        start, end = offsets[current], offsets[current + 1]
+        for neighbor, cost in zip(neighbor_idx[start:end].tolist(), weights[start:end].tolist()):
             # Calculate tentative g_score
-            tentative_g_score = g_scores[current_id] + cost
+            tentative_g_score = current_g + cost
             
             # If this path is better, update it
-            if tentative_g_score < g_scores[neighbor_id]:
+            if tentative_g_score < get_g(neighbor, inf):
                 # Update path
-                predecessors[neighbor_id] = current_id
-                g_scores[neighbor_id] = tentative_g_score
+                predecessors[neighbor] = current
+                g_scores[neighbor] = tentative_g_score
                 
-                # Calculate f_score (g_score + heuristic)
-                neighbor_node = graph.get_node(neighbor_id)
-                heuristic = calculate_heuristic(neighbor_node, goal_node, cost_type)
-                f_scores[neighbor_id] = tentative_g_score + heuristic
+                # Calculate f_score (g_score + heuristic) and add to queue
+                push(priority_queue, (tentative_g_score + heuristics[neighbor], neighbor))
+    
+    # Scatter the reached nodes into the dense result arrays
+    scores = np.full(len(ids), np.inf)
+    pred_array = np.full(len(ids), -1, dtype=np.int32)
+    reached = np.fromiter(g_scores.keys(), dtype=np.intp, count=len(g_scores))
+    scores[reached] = np.fromiter(g_scores.values(), dtype=np.float64, count=len(g_scores))
+    pred_array[reached] = np.fromiter(predecessors.values(), dtype=np.int32, count=len(predecessors))
+    
+    return scores, pred_array
+
+
+def bidirectional_dijkstra(graph: CityGraph, start_id: str, goal_id: str,
+                           cost_type: str = 'time') -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bidirectional Dijkstra for point-to-point shortest paths.
+    
+    Runs a forward search from the start and a backward search (over the
+    reversed edges) from the goal, always expanding the side whose queue has
+    the smaller key, and stops once the two queue heads together can no longer
+    beat the best start -> goal path seen so far.
+    
+    Args:
+        graph: The city graph
+        start_id: ID of the starting node
+        goal_id: ID of the goal node
+        cost_type: 'time' or 'distance' to optimize for
+        
+    Returns:
+        Tuple of (distances, predecessors), both indexed by graph.node_index:
+            distances: float64[V] cost from start of the nodes reached by the
+                forward search (the goal holds the path cost), inf elsewhere
+            predecessors: int32[V] predecessor indices (-1 if none); the chain
+                from goal back to start is complete when a path exists
+    """
+    # Validate cost_type
+    if cost_type not in ['time', 'distance']:
+        raise ValueError("cost_type must be 'time' or 'distance'")
+    
+    id_to_idx = graph.node_index
+    if start_id not in id_to_idx:
+        raise ValueError(f"Start node {start_id} not found in graph")
+    if goal_id not in id_to_idx:
+        raise ValueError(f"Goal node {goal_id} not found in graph")
+    
+    return _bidirectional_search(graph, id_to_idx[start_id], id_to_idx[goal_id], cost_type)
+
+
+def _bidirectional_search(graph: CityGraph, start_idx: int, goal_idx: int,
+                          cost_type: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Run bidirectional Dijkstra on dense node indices (see bidirectional_dijkstra).
+    
+    Args:
+        graph: The city graph
+        start_idx: Dense index of the starting node
+        goal_idx: Dense index of the goal node
+        cost_type: 'time' or 'distance' to optimize for
+        
+    Returns:
+        Tuple of (distances, predecessors) as returned by bidirectional_dijkstra
+    """
+    # Forward and reversed CSR adjacency
+    offsets_f, neighbor_f, _, _, ids, _ = graph.get_csr()
+    offsets_b, neighbor_b, _, _, _, _ = graph.get_reverse_csr()
+    weights_f = graph.get_edge_weights(cost_type)
+    weights_b = graph.get_edge_weights(cost_type, reverse=True)
+    
+    dist_f = {start_idx: 0}
+    dist_b = {goal_idx: 0}
+    pred_f = {start_idx: -1}
+    succ_b = {goal_idx: -1}
+    queue_f = [(0, start_idx)]
+    queue_b = [(0, goal_idx)]
+    
+    # Best start -> goal cost found so far and the node where the searches met
+    mu = 0 if start_idx == goal_idx else math.inf
+    meet_idx = start_idx if start_idx == goal_idx else None
+    
+    # Local bindings for the names used in the loop
+    push, pop, inf = heapq.heappush, heapq.heappop, math.inf
+    
+    while queue_f and queue_b and queue_f[0][0] + queue_b[0][0] < mu:
+        # Expand the side with the smaller key
+        if queue_f[0][0] <= queue_b[0][0]:
+            queue, dist, dist_other, links = queue_f, dist_f, dist_b, pred_f
+            offsets, neighbor_idx, weights = offsets_f, neighbor_f, weights_f
+        else:
+            queue, dist, dist_other, links = queue_b, dist_b, dist_f, succ_b
+            offsets, neighbor_idx, weights = offsets_b, neighbor_b, weights_b
+        
+        # A node is only queued again with a strictly smaller cost, so every
+        # entry above the node's current cost is stale and every other one is
+        # its only (final) expansion
+        current_distance, current = pop(queue)
+        if current_distance > dist[current]:
+            continue
+        
+        start, end = offsets[current], offsets[current + 1]
+        for neighbor, cost in zip(neighbor_idx[start:end].tolist(), weights[start:end].tolist()):
+            new_distance = current_distance + cost
+            if new_distance < dist.get(neighbor, inf):
+                dist[neighbor] = new_distance
+                links[neighbor] = current
+                push(queue, (new_distance, neighbor))
                 
-                # Add to queue
-                heapq.heappush(priority_queue, (f_scores[neighbor_id], neighbor_id))
+                # The edge crosses into the other search's frontier
+                if neighbor in dist_other and new_distance + dist_other[neighbor] < mu:
+                    mu = new_distance + dist_other[neighbor]
+                    meet_idx = neighbor
+    
+    distances = np.full(len(ids), np.inf)
+    predecessors = np.full(len(ids), -1, dtype=np.int32)
+    if dist_f:
+        reached = np.fromiter(dist_f.keys(), dtype=np.intp, count=len(dist_f))
+        distances[reached] = np.fromiter(dist_f.values(), dtype=np.float64, count=len(dist_f))
+        predecessors[reached] = np.fromiter(pred_f.values(), dtype=np.int32, count=len(pred_f))
+    
+    # Stitch the backward half of the path onto the forward predecessors
+    if meet_idx is not None:
+        current = meet_idx
+        while succ_b[current] != -1:
+            predecessors[succ_b[current]] = current
+            current = succ_b[current]
+        distances[goal_idx] = mu
     
-    return g_scores, predecessors
+    return distances, predecessors
 
 
 def calculate_heuristic(node: CityNode, goal_node: CityNode, cost_type: str) -> float:
@@ -197,45 +426,84 @@ def calculate_heuristic(node: CityNode, goal_node: CityNode, cost_type: str) ->
         Heuristic value
     """
     # Calculate the direct distance between nodes
-    distance = haversine_distance(node.lat, node.lng, goal_node.lat, goal_node.lng)
+    distance = haversine_distance_rad(node.lat_rad, node.cos_lat, node.lng_rad,
+                                      goal_node.lat_rad, goal_node.cos_lat, goal_node.lng_rad)
     
-    if cost_type == 'distance':
-        return distance
-    else:  # cost_type == 'time'
-        # Estimate time based on distance, assuming an average speed of 30 km/h
-        # This converts distance in km to time in minutes
-        return distance * 2  # 2 minutes per km (30 km/h)
+    # For 'time', estimate the minutes needed at an average speed of 30 km/h
+    return distance * HEURISTIC_SCALE[cost_type]
 
 
-def reconstruct_path(predecessors: Dict[str, str], start_id: str, goal_id: str) -> List[str]:
+def reconstruct_path(graph: CityGraph, predecessors: np.ndarray, start_id: str, goal_id: str) -> List[str]:
     """
-    Reconstruct the path from start to goal using the predecessors dictionary.
+    Reconstruct the path from start to goal using the predecessors array.
     
     Args:
-        predecessors: Dictionary mapping node IDs to their predecessor
+        graph: The city graph the search ran on
+        predecessors: Array of predecessor indices (-1 for none), indexed by graph.node_index
         start_id: ID of the starting node
         goal_id: ID of the goal node
         
     Returns:
         List of node IDs representing the path from start to goal
     """
-    path = []
-    current_id = goal_id
+    node_index = graph.node_index
+    start_idx = node_index.get(start_id)
+    goal_idx = node_index.get(goal_id)
     
     # If there's no path to the goal
-    if predecessors[goal_id] is None and start_id != goal_id:
+    if start_idx is None or goal_idx is None:
+        return []
+    if predecessors[goal_idx] < 0 and start_idx != goal_idx:
         return []
     
-    # Reconstruct the path by following predecessors from goal to start
-    while current_id != start_id:
-        path.append(current_id)
-        current_id = predecessors[current_id]
+    # Reconstruct the path by following predecessors from goal to start,
+    # prepending each node so the result is already in start -> goal order
+    node_ids = graph.node_ids
+    path = deque([goal_id])
+    current = goal_idx
+    while current != start_idx:
+        current = int(predecessors[current])
+        path.appendleft(node_ids[current])
     
-    # Add the start node
-    path.append(start_id)
+    return list(path)
+
+
+def reconstruct_path_to_target(graph: CityGraph, successors: np.ndarray,
+                               start_id: str, goal_id: str) -> List[str]:
+    """
+    Reconstruct the path from start to goal using the successors of a reverse search.
     
-    # Reverse to get path from start to goal
-    path.reverse()
+    Counterpart of reconstruct_path for dijkstra_algorithm(graph, goal_id, None,
+    cost_type, reverse=True), whose predecessors are each node's next hop
+    towards the goal.
+    
+    Args:
+        graph: The city graph the search ran on
+        successors: Array of next-hop indices towards the goal (-1 for none),
+            indexed by graph.node_index
+        start_id: ID of the starting node
+        goal_id: ID of the goal node (the node the reverse search started from)
+        
+    Returns:
+        List of node IDs representing the path from start to goal
+    """
+    node_index = graph.node_index
+    start_idx = node_index.get(start_id)
+    goal_idx = node_index.get(goal_id)
+    
+    # If there's no path to the goal
+    if start_idx is None or goal_idx is None:
+        return []
+    if successors[start_idx] < 0 and start_idx != goal_idx:
+        return []
+    
+    # Follow the next hops forward from start to goal
+    node_ids = graph.node_ids
+    path = [start_id]
+    current = start_idx
+    while current != goal_idx:
+        current = int(successors[current])
+        path.append(node_ids[current])
     
     return path
 
@@ -320,39 +588,201 @@ def get_path_details(graph: CityGraph, path: List[str]) -> Dict:
     }
 
 
+def _reconstruct_path_details(graph: CityGraph, predecessors: np.ndarray,
+                              start_idx: int, goal_idx: int) -> Dict:
+    """
+    Reconstruct the path from start to goal and build its details in one walk.
+    
+    Equivalent to get_path_details(graph, reconstruct_path(...)), but the
+    nodes and segments are emitted during the single walk over the
+    predecessors (goal to start), with one node lookup per step.
+    
+    Args:
+        graph: The city graph the search ran on
+        predecessors: Array of predecessor indices (-1 for none), indexed by graph.node_index
+        start_idx: Dense index of the starting node
+        goal_idx: Dense index of the goal node
+        
+    Returns:
+        Dictionary with path details (see get_path_details)
+    """
+    # No path, or a path of a single node
+    if start_idx == goal_idx or predecessors[goal_idx] < 0:
+        return get_path_details(graph, [])
+    
+    node_ids = graph.node_ids
+    graph_nodes = graph.nodes
+    
+    # Walk from goal to start, collecting nodes and segments in reverse
+    node = graph_nodes[node_ids[goal_idx]]
+    nodes = [{"id": node.id, "lat": node.lat, "lng": node.lng, "name": node.name}]
+    segments = []
+    current = goal_idx
+    while current != start_idx:
+        current = int(predecessors[current])
+        prev_node = graph_nodes[node_ids[current]]
+        distance, time = prev_node.get_neighbor_cost(node.id)
+        segments.append({"from": prev_node.id, "to": node.id, "distance": distance, "time": time})
+        nodes.append({"id": prev_node.id, "lat": prev_node.lat, "lng": prev_node.lng, "name": prev_node.name})
+        node = prev_node
+    
+    nodes.reverse()
+    segments.reverse()
+    
+    # Totals are summed in start -> goal order, as get_path_details does
+    total_distance = 0
+    total_time = 0
+    for segment in segments:
+        total_distance += segment["distance"]
+        total_time += segment["time"]
+    
+    return {
+        "nodes": nodes,
+        "total_distance": round(total_distance, 2),
+        "total_time": round(total_time, 2),
+        "segments": segments
+    }
+
+
 def find_optimal_path(graph: CityGraph, start_id: str, goal_id: str, algorithm: str = 'a_star', 
                     cost_type: str = 'time') -> Dict:
     """
     Find the optimal path from start to goal using the specified algorithm.
     
+    Results are memoized in an LRU cache keyed on the graph and its version,
+    so repeated queries for the same route are answered without searching again.
+    
     Args:
         graph: The city graph
         start_id: ID of the starting node
         goal_id: ID of the goal node
-        algorithm: 'dijkstra' or 'a_star'
+        algorithm: 'dijkstra', 'bidirectional' or 'a_star'
+        cost_type: 'time' or 'distance' to optimize for
+        
+    Returns:
+        Dictionary with path details
+    """
+    token = _graph_tokens.get(graph)
+    if token is None:
+        token = _graph_tokens[graph] = next(_next_graph_token)
+    
+    key = (token, graph.version, start_id, goal_id, algorithm, cost_type)
+    with _path_cache_lock:
+        path_details = _path_cache.get(key)
+        if path_details is not None:
+            _path_cache.move_to_end(key)
+    
+    if path_details is None:
+        # Search outside the lock; concurrent misses on one key just search twice
+        path_details = _find_optimal_path(graph, start_id, goal_id, algorithm, cost_type)
+        with _path_cache_lock:
+            _path_cache[key] = path_details
+            if len(_path_cache) > PATH_CACHE_SIZE:
+                _path_cache.popitem(last=False)
+    
+    # Callers are free to modify the result, so hand out a copy of the cached one
+    return _copy_path_details(path_details)
+
+
+def _copy_path_details(path_details: Dict) -> Dict:
+    """
+    Copy a path details dictionary.
+    
+    Equivalent to copy.deepcopy for the dictionaries built by get_path_details
+    (every leaf is an immutable scalar or string), but it copies the known
+    containers directly instead of walking every object through deepcopy's memo.
+    
+    Args:
+        path_details: Dictionary with path details
+        
+    Returns:
+        Independent copy of path_details
+    """
+    copied = dict(path_details)
+    copied["nodes"] = [dict(node) for node in path_details["nodes"]]
+    copied["segments"] = [dict(segment) for segment in path_details["segments"]]
+    return copied
+
+
+def find_optimal_paths_batch(graph: CityGraph, start_ids: List[str], goal_id: str,
+                             cost_type: str = 'time') -> Dict[str, Dict]:
+    """
+    Find the optimal paths from several start nodes to one goal.
+    
+    This is the dispatch pattern (many drivers, one pickup). One Dijkstra
+    search backwards from the goal yields the shortest path from every node
+    to it, so the search cost does not grow with the number of starts.
+    
+    Args:
+        graph: The city graph
+        start_ids: IDs of the starting nodes
+        goal_id: ID of the goal node
+        cost_type: 'time' or 'distance' to optimize for
+        
+    Returns:
+        Dictionary mapping each start ID to its path details
+    """
+    _, successors = dijkstra_algorithm(graph, goal_id, None, cost_type, reverse=True)
+    
+    results = {}
+    for start_id in start_ids:
+        path_details = get_path_details(graph, reconstruct_path_to_target(graph, successors, start_id, goal_id))
+        path_details["algorithm"] = 'dijkstra'
+        path_details["cost_type"] = cost_type
+        results[start_id] = path_details
+    
+    return results
+
+
+def _find_optimal_path(graph: CityGraph, start_id: str, goal_id: str, algorithm: str,
+                       cost_type: str) -> Dict:
+    """
+    Run the path search behind find_optimal_path (uncached).
+    
+    Args:
+        graph: The city graph
+        start_id: ID of the starting node
+        goal_id: ID of the goal node
+        algorithm: 'dijkstra', 'bidirectional' or 'a_star'
         cost_type: 'time' or 'distance' to optimize for
         
     Returns:
         Dictionary with path details
     """
     # Validate inputs
-    if algorithm not in ['dijkstra', 'a_star']:
-        raise ValueError("algorithm must be 'dijkstra' or 'a_star'")
+    if algorithm not in ['dijkstra', 'bidirectional', 'a_star']:
+        raise ValueError("algorithm must be 'dijkstra', 'bidirectional' or 'a_star'")
     
     if cost_type not in ['time', 'distance']:
         raise ValueError("cost_type must be 'time' or 'distance'")
     
-    # Run the specified algorithm
-    if algorithm == 'dijkstra':
-        scores, predecessors = dijkstra_algorithm(graph, start_id, goal_id, cost_type)
-    else:  # algorithm == 'a_star'
-        scores, predecessors = a_star_algorithm(graph, start_id, goal_id, cost_type)
-    
-    # Reconstruct the path
-    path = reconstruct_path(predecessors, start_id, goal_id)
+    # Map the IDs to dense indices once; the searches and the path
+    # reconstruction below work on indices only
+    node_index = graph.node_index
+    start_idx = node_index.get(start_id)
+    goal_idx = node_index.get(goal_id)
+    if algorithm != 'dijkstra':
+        if start_idx is None:
+            raise ValueError(f"Start node {start_id} not found in graph")
+        if goal_idx is None:
+            raise ValueError(f"Goal node {goal_id} not found in graph")
+    
+    # Unknown nodes, or nodes in different components, cannot be connected
+    components = graph.get_components()
+    if start_idx is None or goal_idx is None or components[start_idx] != components[goal_idx]:
+        path_details = get_path_details(graph, [])
+    else:
+        # Run the specified algorithm
+        if algorithm == 'dijkstra':
+            scores, predecessors = _dijkstra_search(graph, start_idx, goal_idx, cost_type)
+        elif algorithm == 'bidirectional':
+            scores, predecessors = _bidirectional_search(graph, start_idx, goal_idx, cost_type)
+        else:  # algorithm == 'a_star'
+            scores, predecessors = _a_star_search(graph, start_idx, goal_idx, cost_type)
+        
+        # Reconstruct the path and get its details
+        path_details = _reconstruct_path_details(graph, predecessors, start_idx, goal_idx)
     
-    # Get path details
-    path_details = get_path_details(graph, path)
     path_details["algorithm"] = algorithm
     path_details["cost_type"] = cost_type
     
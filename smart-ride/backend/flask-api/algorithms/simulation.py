@@ -8,23 +8,42 @@ and pathfinding algorithms.
 Time Complexity Analysis:
 - Simulation Step: O(D + R), where D is the number of active drivers and R is the number of active rides
   * Each driver movement calculation: O(1)
-  * Each ride progress update: O(1)
+  * Each ride progress update: O(1), done for all rides at once over the
+    structure-of-arrays ride slots; only rides that finish a segment take a
+    Python-level step
 
 Space Complexity:
 - O(D + R + V), where D is the number of drivers, R is the number of rides, and V is the graph vertices
 """
 
+import heapq
+import itertools
 import time
 import math
+import queue
 import random
+import sys
 import threading
 import json
 from typing import Dict, List, Tuple, Set, Optional
 from datetime import datetime
 
-from .city_graph import CityGraph, CityNode, haversine_distance
-from .pathfinding import find_optimal_path, reconstruct_path
+import numpy as np
+
+from .city_graph import CityGraph, haversine_vector
+from .pathfinding import find_optimal_path
 from .driver_matching import Driver, RideRequest, DriverMatcher, DriverStatus
+from ._numba_kernels import advance_segments
+
+# Real time, in seconds, between two simulation ticks
+TICK_INTERVAL = 0.1
+
+# Undelivered states kept per observer; older ones are dropped first
+OBSERVER_QUEUE_SIZE = 4
+
+# Lengths are clamped to this (about a millimeter) before inverting, so a
+# degenerate zero-length segment is finished in any step instead of giving inf
+MIN_SEGMENT_KM = 1e-6
 
 
 class RideStatus:
@@ -48,7 +67,8 @@ class ActiveRide:
                  driver_to_pickup_path: List[str],
                  pickup_to_dropoff_path: List[str],
                  estimated_pickup_time: float,
-                 estimated_fare: float):
+                 estimated_fare: float,
+                 graph: Optional[CityGraph] = None):
         """
         Initialize an active ride.
         
@@ -60,12 +80,15 @@ class ActiveRide:
             pickup_to_dropoff_path: Path from pickup to dropoff
             estimated_pickup_time: Estimated time for driver to reach pickup
             estimated_fare: Estimated fare for the ride
+            graph: The city graph, used to precompute the segment geometry of
+                both paths (computed on first use if omitted)
         """
         self.ride_id = ride_id
         self.request = request
         self.driver = driver
-        self.driver_to_pickup_path = driver_to_pickup_path
-        self.pickup_to_dropoff_path = pickup_to_dropoff_path
+        # Interned node IDs hash and compare by identity in the graph's node dict
+        self.driver_to_pickup_path = [sys.intern(node_id) for node_id in driver_to_pickup_path]
+        self.pickup_to_dropoff_path = [sys.intern(node_id) for node_id in pickup_to_dropoff_path]
         self.estimated_pickup_time = estimated_pickup_time
         self.estimated_fare = estimated_fare
         
@@ -75,9 +98,47 @@ class ActiveRide:
         self.completion_time = None
         
         # Progress tracking
-        self.current_path = driver_to_pickup_path
+        self.current_path = self.driver_to_pickup_path
         self.current_path_segment = 0
         self.segment_progress = 0.0  # 0.0 to 1.0
+        
+        # Per-segment (from_lat, from_lng, to_lat, to_lng) rows and inverse lengths in 1/km
+        self._segments_graph = None
+        self._active_segs = self._active_inv_lens = None
+        if graph is not None:
+            self._build_segments(graph)
+    
+    def _build_segments(self, graph: CityGraph):
+        """
+        Precompute the segment endpoints and inverse lengths of both paths.
+        
+        Args:
+            graph: The city graph
+        """
+        self._pickup_segs, self._pickup_inv_lens = _path_segments(graph, self.driver_to_pickup_path)
+        self._dropoff_segs, self._dropoff_inv_lens = _path_segments(graph, self.pickup_to_dropoff_path)
+        self._segments_graph = graph
+        
+        if self.current_path is self.pickup_to_dropoff_path:
+            self._active_segs, self._active_inv_lens = self._dropoff_segs, self._dropoff_inv_lens
+        else:
+            self._active_segs, self._active_inv_lens = self._pickup_segs, self._pickup_inv_lens
+    
+    def _current_segment_index(self, graph: CityGraph) -> int:
+        """
+        Get the row of the current segment in the active segment arrays.
+        
+        Args:
+            graph: The city graph
+            
+        Returns:
+            Segment index, or -1 if the current path has no segment
+        """
+        if self._segments_graph is not graph:
+            self._build_segments(graph)
+        
+        # Past the end of the path, stay on the last segment (as get_current_segment)
+        return min(self.current_path_segment, len(self._active_inv_lens) - 1)
     
     def update_status(self, new_status: str):
         """
@@ -94,6 +155,8 @@ class ActiveRide:
             self.current_path = self.pickup_to_dropoff_path
             self.current_path_segment = 0
             self.segment_progress = 0.0
+            if self._segments_graph is not None:
+                self._active_segs, self._active_inv_lens = self._dropoff_segs, self._dropoff_inv_lens
         
         elif new_status == RideStatus.COMPLETED:
             self.completion_time = time.time()
@@ -132,45 +195,69 @@ class ActiveRide:
         # Calculate distance covered in this time step
         distance_covered = speed_kms * delta_time
         
-        # Get current segment
-        from_node_id, to_node_id = self.get_current_segment()
-        from_node = graph.get_node(from_node_id)
-        to_node = graph.get_node(to_node_id)
-        
-        if not from_node or not to_node:
+        # Get the precomputed inverse length of the current segment
+        i = self._current_segment_index(graph)
+        if i < 0:
             return False
         
-        # Calculate segment distance
-        segment_distance = haversine_distance(
-            from_node.lat, from_node.lng,
-            to_node.lat, to_node.lng
-        )
+        inv_length = float(self._active_inv_lens[i])
+        if math.isnan(inv_length):
+            return False  # a segment node is not in the graph
         
         # Calculate progress increment
-        progress_increment = distance_covered / segment_distance
-        self.segment_progress += progress_increment
+        self.segment_progress += distance_covered * inv_length
         
         # Check if segment is completed
         if self.segment_progress >= 1.0:
-            # Move to next segment
-            self.current_path_segment += 1
-            self.segment_progress = 0.0
+            return self.advance_segment()
+        
+        return False  # Segment still in progress
+    
+    def advance_segment(self) -> bool:
+        """
+        Move on to the next path segment, updating the status at the end of the path.
+        
+        Returns:
+            True (a segment was completed)
+        """
+        # Move to next segment
+        self.current_path_segment += 1
+        self.segment_progress = 0.0
+        
+        # Check if we've finished the current path
+        if self.current_path_segment >= len(self.current_path) - 1:
+            if self.status == RideStatus.DRIVER_EN_ROUTE:
+                # Driver has arrived at pickup
+                self.update_status(RideStatus.ARRIVED)
             
-            # Check if we've finished the current path
-            if self.current_path_segment >= len(self.current_path) - 1:
-                if self.status == RideStatus.DRIVER_EN_ROUTE:
-                    # Driver has arrived at pickup
-                    self.update_status(RideStatus.ARRIVED)
-                    return True
-                
-                elif self.status == RideStatus.IN_PROGRESS:
-                    # Ride is completed
-                    self.update_status(RideStatus.COMPLETED)
-                    return True
+            elif self.status == RideStatus.IN_PROGRESS:
+                # Ride is completed
+                self.update_status(RideStatus.COMPLETED)
+        
+        return True  # Segment completed
+    
+    def segment_geometry(self, graph: CityGraph) -> Optional[Tuple[float, float, float, float, float]]:
+        """
+        Get the endpoints and inverse length of the current path segment.
+        
+        Args:
+            graph: The city graph
             
-            return True  # Segment completed
+        Returns:
+            Tuple of (from_lat, from_lng, to_lat, to_lng, inv_length) with the
+            inverse length in 1/km, or None if the path has no segment or its
+            nodes are not in the graph
+        """
+        i = self._current_segment_index(graph)
+        if i < 0:
+            return None
         
-        return False  # Segment still in progress
+        inv_length = float(self._active_inv_lens[i])
+        if math.isnan(inv_length):
+            return None
+        
+        from_lat, from_lng, to_lat, to_lng = self._active_segs[i].tolist()
+        return (from_lat, from_lng, to_lat, to_lng, inv_length)
     
     def get_current_location(self, graph: CityGraph) -> Tuple[float, float]:
         """
@@ -182,20 +269,65 @@ class ActiveRide:
         Returns:
             (latitude, longitude) tuple
         """
-        from_node_id, to_node_id = self.get_current_segment()
-        from_node = graph.get_node(from_node_id)
-        to_node = graph.get_node(to_node_id)
-        
-        if not from_node or not to_node:
+        i = self._current_segment_index(graph)
+        if i < 0 or math.isnan(self._active_inv_lens[i]):
             return (0, 0)
         
-        # Interpolate position
-        lat = from_node.lat + (to_node.lat - from_node.lat) * self.segment_progress
-        lng = from_node.lng + (to_node.lng - from_node.lng) * self.segment_progress
+        # Interpolate position (in the same form as the simulation tick)
+        from_lat, from_lng, to_lat, to_lng = self._active_segs[i].tolist()
+        progress = self.segment_progress
+        lat = from_lat * (1.0 - progress) + to_lat * progress
+        lng = from_lng * (1.0 - progress) + to_lng * progress
         
         return (lat, lng)
 
 
+def _path_segments(graph: CityGraph, path: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build the segment arrays of a path.
+    
+    Args:
+        graph: The city graph
+        path: List of node IDs
+        
+    Returns:
+        Tuple of (segments, inv_lengths): float64[S, 4] rows of (from_lat,
+        from_lng, to_lat, to_lng) in degrees and float64[S] inverse lengths in
+        1/km, where S is len(path) - 1; segments touching a node missing from
+        the graph have NaN inverse lengths
+    """
+    # One row per node, using the radians and cosines cached on each CityNode
+    missing = (np.nan,) * 5
+    coords = np.array([(node.lat, node.lng, node.lat_rad, node.lng_rad, node.cos_lat) if node else missing
+                       for node in map(graph.get_node, path)], dtype=np.float64).reshape(-1, 5)
+    start, end = coords[:-1], coords[1:]
+    
+    segments = np.concatenate((start[:, :2], end[:, :2]), axis=1)
+    lengths = haversine_vector(start[:, 2], start[:, 3], end[:, 2], end[:, 3],
+                               cos_lat_r=start[:, 4], cos_lat=end[:, 4])
+    # Inverted once here so that advancing a ride multiplies instead of divides
+    return segments, 1.0 / np.maximum(lengths, MIN_SEGMENT_KM)
+
+
+def _path_node_ids(path_result: Dict, start_id: str, goal_id: str) -> List[str]:
+    """
+    Get the node IDs of a find_optimal_path result.
+    
+    Args:
+        path_result: Result of find_optimal_path
+        start_id: ID of the start node of the search
+        goal_id: ID of the goal node of the search
+        
+    Returns:
+        List of node IDs from start to goal, empty if there is no path
+    """
+    node_ids = [node['id'] for node in path_result['nodes']]
+    if not node_ids and start_id == goal_id and start_id is not None:
+        # Already at the goal: one zero-length segment, finished on the next tick
+        node_ids = [start_id, goal_id]
+    return node_ids
+
+
 class RideSimulator:
     """Class for simulating rides in real-time."""
     
@@ -209,11 +341,152 @@ class RideSimulator:
         self.city_graph = city_graph
         self.driver_matcher = DriverMatcher(city_graph)
         self.active_rides = {}  # ride_id -> ActiveRide
+        self._request_ids = itertools.count(1)  # collision-free, unlike timestamps
+        self._ride_ids = itertools.count(1)
         self.simulation_speed = 10.0  # 10x real time
         self.is_running = False
         self.simulation_thread = None
         self.last_update_time = None
+        self._pending_actions: List[Tuple[float, str, str]] = []  # heap of (due time, ride_id, action)
         self.observers = []  # Callbacks for simulation updates
+        
+        # Guards the rides, the ride arrays and the drivers: request threads
+        # change them while the simulation thread ticks. Reentrant, since the
+        # tick starts rides through start_ride.
+        self._lock = threading.RLock()
+        self._observer_queues: List[queue.Queue] = []  # full-state observers, one queue each
+        self._change_mailboxes: List[_ChangeMailbox] = []  # changes-only observers, one each
+        
+        # What get_simulation_changes last reported: ID -> comparison key
+        self._published_rides: Dict[str, tuple] = {}
+        self._published_drivers: Dict[str, tuple] = {}
+        
+        # Structure-of-arrays state of the rides, indexed by slot, so that one
+        # simulation tick advances every moving ride with a few array operations
+        self._ride_slot: Dict[str, int] = {}  # ride_id -> slot
+        self._slot_rides: List[Optional[ActiveRide]] = []  # slot -> ride, None if free
+        self._free_slots: List[int] = []
+        self._seg_prog = np.zeros(0, dtype=np.float64)  # progress along the segment, 0.0 to 1.0
+        self._seg_inv_len = np.ones(0, dtype=np.float64)  # 1 / segment length in km
+        self._seg_from = np.zeros((0, 2), dtype=np.float64)  # (lat, lng) of the segment start
+        self._seg_to = np.zeros((0, 2), dtype=np.float64)  # (lat, lng) of the segment end
+        self._slot_moving = np.zeros(0, dtype=bool)  # driver en route or ride in progress
+    
+    def _attach_ride(self, ride: ActiveRide):
+        """
+        Give a ride a slot in the ride arrays.
+        
+        Args:
+            ride: The ride to attach
+        """
+        if self._free_slots:
+            slot = self._free_slots.pop()
+        else:
+            slot = len(self._slot_rides)
+            self._slot_rides.append(None)
+            if slot == len(self._seg_prog):
+                self._grow_ride_arrays()
+        
+        self._slot_rides[slot] = ride
+        self._ride_slot[ride.ride_id] = slot
+        self._sync_ride_slot(ride)
+    
+    def _grow_ride_arrays(self):
+        """Double the capacity of the ride arrays."""
+        capacity = max(16, 2 * len(self._seg_prog))
+        
+        def grow(arr, fill):
+            grown = np.full((capacity,) + arr.shape[1:], fill, dtype=arr.dtype)
+            grown[:len(arr)] = arr
+            return grown
+        
+        self._seg_prog = grow(self._seg_prog, 0.0)
+        self._seg_inv_len = grow(self._seg_inv_len, 1.0)
+        self._seg_from = grow(self._seg_from, 0.0)
+        self._seg_to = grow(self._seg_to, 0.0)
+        self._slot_moving = grow(self._slot_moving, False)
+    
+    def _sync_ride_slot(self, ride: ActiveRide):
+        """
+        Copy a ride's current segment and status into its slot.
+        
+        Called whenever the ride changes segment or status outside the
+        vectorized tick; finished rides give their slot back.
+        
+        Args:
+            ride: The ride to sync
+        """
+        slot = self._ride_slot.get(ride.ride_id)
+        if slot is None:
+            return
+        
+        if ride.status in (RideStatus.COMPLETED, RideStatus.CANCELLED):
+            self._slot_moving[slot] = False
+            self._slot_rides[slot] = None
+            del self._ride_slot[ride.ride_id]
+            self._free_slots.append(slot)
+            return
+        
+        geometry = ride.segment_geometry(self.city_graph)
+        if geometry is None:
+            self._slot_moving[slot] = False
+            return
+        
+        from_lat, from_lng, to_lat, to_lng, inv_length = geometry
+        self._seg_prog[slot] = ride.segment_progress
+        self._seg_inv_len[slot] = inv_length
+        self._seg_from[slot] = (from_lat, from_lng)
+        self._seg_to[slot] = (to_lat, to_lng)
+        self._slot_moving[slot] = ride.status in (RideStatus.DRIVER_EN_ROUTE, RideStatus.IN_PROGRESS)
+    
+    def _advance_rides(self, delta_time: float, speed: float = 30.0) -> Tuple[List[str], List[str]]:
+        """
+        Advance every moving ride by one time step.
+        
+        Progress and locations are computed for all rides at once; only the
+        rides that complete a segment are stepped individually.
+        
+        Args:
+            delta_time: Time elapsed in seconds
+            speed: Speed in km/h
+            
+        Returns:
+            Tuple of (arrived, completed): IDs of the rides whose driver arrived
+            at the pickup and of the rides completed in this step
+        """
+        moving = np.flatnonzero(self._slot_moving)
+        if not len(moving):
+            return [], []
+        
+        # Advance by the distance covered (km/h -> km/s) and interpolate every
+        # driver's position along its segment; a driver that finished its
+        # segment is at its end (the start of the next one). The kernel
+        # releases the GIL when numba is available; the caller holds the
+        # simulator lock, so the ride arrays cannot change underneath it.
+        locations = advance_segments(
+            moving, self._seg_prog, self._seg_inv_len, self._seg_from, self._seg_to,
+            delta_time * (speed / 3600.0)
+        )
+        
+        rides = [self._slot_rides[slot] for slot in moving.tolist()]
+        self.driver_matcher.update_driver_locations(
+            [ride.driver.id for ride in rides], locations[:, 0], locations[:, 1]
+        )
+        
+        # Store the new progress, rolling finished segments over to the next one
+        arrived, completed = [], []
+        for ride, ride_progress in zip(rides, self._seg_prog[moving].tolist()):
+            if ride_progress >= 1.0:
+                ride.advance_segment()
+                if ride.status == RideStatus.ARRIVED:
+                    arrived.append(ride.ride_id)
+                elif ride.status == RideStatus.COMPLETED:
+                    completed.append(ride.ride_id)
+                self._sync_ride_slot(ride)
+            else:
+                ride.segment_progress = ride_progress
+        
+        return arrived, completed
     
     def add_driver(self, driver: Driver):
         """
@@ -222,7 +495,8 @@ class RideSimulator:
         Args:
             driver: The driver to add
         """
-        self.driver_matcher.add_driver(driver)
+        with self._lock:
+            self.driver_matcher.add_driver(driver)
     
     def add_drivers(self, drivers: List[Driver]):
         """
@@ -231,8 +505,8 @@ class RideSimulator:
         Args:
             drivers: List of drivers to add
         """
-        for driver in drivers:
-            self.add_driver(driver)
+        with self._lock:
+            self.driver_matcher.add_drivers(drivers)
     
     def create_ride_request(self, pickup_lat: float, pickup_lng: float,
                            dropoff_lat: float, dropoff_lng: float,
@@ -251,7 +525,7 @@ class RideSimulator:
             New ride request
         """
         request = RideRequest(
-            id=f"request-{int(time.time())}",
+            id=f"request-{next(self._request_ids)}",
             user_id="user-001",
             pickup_location=(pickup_lat, pickup_lng),
             dropoff_location=(dropoff_lat, dropoff_lng),
@@ -261,6 +535,39 @@ class RideSimulator:
         # Prepare the request (find nearest nodes)
         return self.driver_matcher.prepare_ride_request(request)
     
+    def create_ride_requests(self, pickups, dropoffs,
+                             vehicle_type: str = 'sedan') -> List[RideRequest]:
+        """
+        Create several ride requests at once.
+        
+        The nearest nodes of all pickups and dropoffs are found in one batched
+        query instead of one search per request.
+        
+        Args:
+            pickups: Sequence or (N, 2) array of pickup (lat, lng) pairs
+            dropoffs: Sequence or (N, 2) array of dropoff (lat, lng) pairs
+            vehicle_type: Type of vehicle requested
+            
+        Returns:
+            List of new ride requests, in input order
+        """
+        pickups = np.asarray(pickups, dtype=np.float64).reshape(-1, 2).tolist()
+        dropoffs = np.asarray(dropoffs, dtype=np.float64).reshape(-1, 2).tolist()
+        
+        requests = [
+            RideRequest(
+                id=f"request-{next(self._request_ids)}",
+                user_id="user-001",
+                pickup_location=(pickup_lat, pickup_lng),
+                dropoff_location=(dropoff_lat, dropoff_lng),
+                vehicle_type=vehicle_type
+            )
+            for (pickup_lat, pickup_lng), (dropoff_lat, dropoff_lng) in zip(pickups, dropoffs)
+        ]
+        
+        # Prepare the requests (find nearest nodes)
+        return self.driver_matcher.prepare_ride_requests(requests)
+    
     def request_ride(self, request: RideRequest) -> Dict:
         """
         Request a ride and find matching drivers.
@@ -310,35 +617,45 @@ class RideSimulator:
             algorithm='a_star', cost_type='time'
         )
         
+        # The paths' node IDs are already in the results; no predecessor walk needed
+        driver_to_pickup_path = _path_node_ids(driver_to_pickup, driver.nearest_node_id, request.pickup_node_id)
+        pickup_to_dropoff_path = _path_node_ids(pickup_to_dropoff, request.pickup_node_id, request.dropoff_node_id)
+        if not driver_to_pickup_path or not pickup_to_dropoff_path:
+            return {'error': 'No route found'}
+        
         # Create ride ID
-        ride_id = f"ride-{int(time.time())}"
+        ride_id = f"ride-{next(self._ride_ids)}"
         
         # Estimate fare
-        estimated_fare = self.driver_matcher.estimate_fare(request, pickup_to_dropoff)
+        estimated_fare = self.driver_matcher.estimate_fare(request)
         
         # Create active ride
         active_ride = ActiveRide(
             ride_id=ride_id,
             request=request,
             driver=driver,
-            driver_to_pickup_path=reconstruct_path(
-                driver_to_pickup['predecessors'], driver.nearest_node_id, request.pickup_node_id
-            ),
-            pickup_to_dropoff_path=reconstruct_path(
-                pickup_to_dropoff['predecessors'], request.pickup_node_id, request.dropoff_node_id
-            ),
+            driver_to_pickup_path=driver_to_pickup_path,
+            pickup_to_dropoff_path=pickup_to_dropoff_path,
             estimated_pickup_time=driver_to_pickup['total_time'],
-            estimated_fare=estimated_fare
+            estimated_fare=estimated_fare,
+            graph=self.city_graph
         )
         
-        # Update driver status
-        self.driver_matcher.update_driver_status(driver_id, "busy")
-        
-        # Update ride status
-        active_ride.update_status(RideStatus.DRIVER_EN_ROUTE)
-        
-        # Add to active rides
-        self.active_rides[ride_id] = active_ride
+        with self._lock:
+            # The paths were found without the lock; the driver may have been
+            # taken in the meantime
+            if driver.status != DriverStatus.AVAILABLE:
+                return {'error': 'Driver is not available'}
+            
+            # Update driver status
+            self.driver_matcher.update_driver_status(driver_id, "busy")
+            
+            # Update ride status
+            active_ride.update_status(RideStatus.DRIVER_EN_ROUTE)
+            
+            # Add to active rides
+            self.active_rides[ride_id] = active_ride
+            self._attach_ride(active_ride)
         
         return {
             'ride_id': ride_id,
@@ -409,18 +726,20 @@ class RideSimulator:
         Returns:
             Dictionary with ride status
         """
-        if ride_id not in self.active_rides:
-            return {'error': 'Ride not found'}
-        
-        ride = self.active_rides[ride_id]
-        
-        if ride.status != RideStatus.ARRIVED:
-            return {'error': 'Driver has not arrived at pickup yet'}
-        
-        # Update ride status
-        ride.update_status(RideStatus.IN_PROGRESS)
-        
-        return self.get_ride_status(ride_id)
+        with self._lock:
+            if ride_id not in self.active_rides:
+                return {'error': 'Ride not found'}
+            
+            ride = self.active_rides[ride_id]
+            
+            if ride.status != RideStatus.ARRIVED:
+                return {'error': 'Driver has not arrived at pickup yet'}
+            
+            # Update ride status
+            ride.update_status(RideStatus.IN_PROGRESS)
+            self._sync_ride_slot(ride)
+            
+            return self.get_ride_status(ride_id)
     
     def cancel_ride(self, ride_id: str) -> Dict:
         """
@@ -432,18 +751,20 @@ class RideSimulator:
         Returns:
             Dictionary with ride status
         """
-        if ride_id not in self.active_rides:
-            return {'error': 'Ride not found'}
-        
-        ride = self.active_rides[ride_id]
-        
-        # Update ride status
-        ride.update_status(RideStatus.CANCELLED)
-        
-        # Update driver status
-        self.driver_matcher.update_driver_status(ride.driver.id, "available")
-        
-        return self.get_ride_status(ride_id)
+        with self._lock:
+            if ride_id not in self.active_rides:
+                return {'error': 'Ride not found'}
+            
+            ride = self.active_rides[ride_id]
+            
+            # Update ride status
+            ride.update_status(RideStatus.CANCELLED)
+            self._sync_ride_slot(ride)
+            
+            # Update driver status
+            self.driver_matcher.update_driver_status(ride.driver.id, "available")
+            
+            return self.get_ride_status(ride_id)
     
     def complete_ride(self, ride_id: str) -> Dict:
         """
@@ -455,36 +776,74 @@ class RideSimulator:
         Returns:
             Dictionary with ride status
         """
-        if ride_id not in self.active_rides:
-            return {'error': 'Ride not found'}
-        
-        ride = self.active_rides[ride_id]
-        
-        if ride.status != RideStatus.IN_PROGRESS:
-            return {'error': 'Ride is not in progress'}
-        
-        # Update ride status
-        ride.update_status(RideStatus.COMPLETED)
-        
-        # Update driver status
-        self.driver_matcher.update_driver_status(ride.driver.id, "available")
-        
-        return self.get_ride_status(ride_id)
+        with self._lock:
+            if ride_id not in self.active_rides:
+                return {'error': 'Ride not found'}
+            
+            ride = self.active_rides[ride_id]
+            
+            if ride.status != RideStatus.IN_PROGRESS:
+                return {'error': 'Ride is not in progress'}
+            
+            # Update ride status
+            ride.update_status(RideStatus.COMPLETED)
+            self._sync_ride_slot(ride)
+            
+            # Update driver status
+            self.driver_matcher.update_driver_status(ride.driver.id, "available")
+            
+            return self.get_ride_status(ride_id)
     
-    def add_observer(self, callback):
+    def add_observer(self, callback, changes_only: bool = False):
         """
         Add an observer to receive simulation updates.
         
+        The callback runs on its own daemon thread, so a slow observer never
+        delays the simulation. If it falls behind, a full-state observer skips
+        the oldest states, while a changes-only observer receives the pending
+        changes merged into one update.
+        
         Args:
             callback: Function to call with updates
+            changes_only: Receive get_simulation_changes updates (starting with
+                the whole current state as added entries) instead of full states
         """
+        if changes_only:
+            updates = _ChangeMailbox()
+            updates.put(_state_as_changes(self.get_simulation_state()))
+            self._change_mailboxes.append(updates)
+        else:
+            updates = queue.Queue(maxsize=OBSERVER_QUEUE_SIZE)
+            self._observer_queues.append(updates)
+        
+        thread = threading.Thread(target=_run_observer, args=(callback, updates))
+        thread.daemon = True
+        thread.start()
+        
         self.observers.append(callback)
     
     def notify_observers(self):
-        """Notify all observers of simulation state."""
+        """Queue the simulation state for every observer, without waiting on them."""
+        if self._change_mailboxes:
+            changes = self.get_simulation_changes()
+            for mailbox in self._change_mailboxes:
+                mailbox.put(changes)
+        
+        if not self._observer_queues:
+            return
+        
         simulation_state = self.get_simulation_state()
-        for observer in self.observers:
-            observer(simulation_state)
+        for updates in self._observer_queues:
+            # Drop the oldest undelivered state if the observer is behind
+            while True:
+                try:
+                    updates.put_nowait(simulation_state)
+                    break
+                except queue.Full:
+                    try:
+                        updates.get_nowait()
+                    except queue.Empty:
+                        pass
     
     def get_simulation_state(self) -> Dict:
         """
@@ -493,81 +852,142 @@ class RideSimulator:
         Returns:
             Dictionary with simulation state
         """
-        active_rides_state = {}
-        
-        for ride_id, ride in self.active_rides.items():
-            if ride.status in [RideStatus.COMPLETED, RideStatus.CANCELLED]:
-                continue
-            
-            current_location = ride.get_current_location(self.city_graph)
-            
-            active_rides_state[ride_id] = {
-                'ride_id': ride.ride_id,
-                'status': ride.status,
-                'driver': {
-                    'id': ride.driver.id,
-                    'name': ride.driver.name,
-                    'current_location': current_location
-                },
-                'pickup': ride.request.pickup_location,
-                'dropoff': ride.request.dropoff_location,
-                'progress': {
-                    'path_segment': ride.current_path_segment,
-                    'segment_progress': ride.segment_progress
-                }
+        with self._lock:
+            active_rides_state = {}
+            
+            for ride_id, ride in self.active_rides.items():
+                if ride.status in [RideStatus.COMPLETED, RideStatus.CANCELLED]:
+                    continue
+                
+                active_rides_state[ride_id] = self._ride_state(ride)
+            
+            available_drivers = []
+            for driver in self.driver_matcher.get_available_drivers():
+                available_drivers.append(_driver_state(driver))
+            
+            return {
+                'timestamp': datetime.now().isoformat(),
+                'active_rides': active_rides_state,
+                'available_drivers': available_drivers
             }
+    
+    def get_simulation_changes(self) -> Dict:
+        """
+        Get what changed in the simulation state since the previous call.
         
-        available_drivers = []
-        for driver in self.driver_matcher.get_available_drivers():
-            available_drivers.append({
-                'id': driver.id,
-                'name': driver.name,
-                'location': driver.current_location,
-                'vehicle_type': driver.vehicle_type
-            })
+        Each section holds the entries that appeared ('added'), the entries
+        whose content changed ('updated'), both in the get_simulation_state
+        format, and the IDs of the entries that went away ('removed'). A ride
+        or driver that did not change costs one tuple comparison and is left
+        out, so the update scales with the changes rather than the total.
+        Observers should treat 'added' and 'updated' alike (set the entry) and
+        ignore removals of IDs they do not have.
         
+        Returns:
+            Dictionary with 'timestamp', 'active_rides' and 'available_drivers'
+            sections (drivers are keyed by driver ID)
+        """
+        with self._lock:
+            rides = {}
+            for ride_id, ride in self.active_rides.items():
+                if ride.status in [RideStatus.COMPLETED, RideStatus.CANCELLED]:
+                    continue
+                
+                # The location follows from the path, segment and progress
+                rides[ride_id] = ((ride.status, ride.current_path_segment, ride.segment_progress), ride)
+            
+            drivers = {
+                driver.id: ((driver.current_location,), driver)
+                for driver in self.driver_matcher.get_available_drivers()
+            }
+            
+            return {
+                'timestamp': datetime.now().isoformat(),
+                'active_rides': _diff_section(self._published_rides, rides, self._ride_state),
+                'available_drivers': _diff_section(self._published_drivers, drivers, _driver_state)
+            }
+    
+    def _ride_state(self, ride: ActiveRide) -> Dict:
+        """
+        Build the state entry of a ride.
+        
+        Args:
+            ride: The ride
+            
+        Returns:
+            Dictionary with the ride's state
+        """
         return {
-            'timestamp': datetime.now().isoformat(),
-            'active_rides': active_rides_state,
-            'available_drivers': available_drivers
+            'ride_id': ride.ride_id,
+            'status': ride.status,
+            'driver': {
+                'id': ride.driver.id,
+                'name': ride.driver.name,
+                'current_location': ride.get_current_location(self.city_graph)
+            },
+            'pickup': ride.request.pickup_location,
+            'dropoff': ride.request.dropoff_location,
+            'progress': {
+                'path_segment': ride.current_path_segment,
+                'segment_progress': ride.segment_progress
+            }
         }
     
+    def _release_driver(self, ride_id: str):
+        """
+        Make the driver of a completed ride available again.
+        
+        Args:
+            ride_id: ID of the ride
+        """
+        ride = self.active_rides.get(ride_id)
+        if ride is not None and ride.status == RideStatus.COMPLETED:
+            self.driver_matcher.update_driver_status(ride.driver.id, "available")
+    
     def simulation_loop(self):
-        """Main simulation loop."""
-        self.last_update_time = time.time()
+        """Main simulation loop, run at a fixed rate of one tick per TICK_INTERVAL."""
+        # Monotonic clock, so that wall-clock adjustments never skew delta_time
+        self.last_update_time = time.monotonic()
+        next_tick = self.last_update_time
         
         while self.is_running:
             # Calculate time since last update
-            current_time = time.time()
+            current_time = time.monotonic()
             delta_time = (current_time - self.last_update_time) * self.simulation_speed
             self.last_update_time = current_time
             
-            # Update all active rides
-            for ride_id, ride in list(self.active_rides.items()):
-                if ride.status in [RideStatus.DRIVER_EN_ROUTE, RideStatus.IN_PROGRESS]:
-                    segment_completed = ride.update_progress(delta_time, self.city_graph)
-                    
-                    if segment_completed:
-                        # If driver arrived at pickup and ride not started yet
-                        if ride.status == RideStatus.ARRIVED:
-                            # Auto-start ride after a short delay
-                            time.sleep(1.0 / self.simulation_speed)
-                            self.start_ride(ride_id)
-                    
-                    # Update driver location
-                    current_location = ride.get_current_location(self.city_graph)
-                    self.driver_matcher.update_driver_location(ride.driver.id, current_location)
+            with self._lock:
+                # Run the deferred actions that are due
+                pending = self._pending_actions
+                while pending and pending[0][0] <= current_time:
+                    _, ride_id, action = heapq.heappop(pending)
+                    if action == 'start':
+                        self.start_ride(ride_id)
+                    elif action == 'release':
+                        self._release_driver(ride_id)
                 
-                # If ride is completed, update driver status after a delay
-                if ride.status == RideStatus.COMPLETED and ride.completion_time:
-                    if current_time - ride.completion_time > 5.0:
-                        self.driver_matcher.update_driver_status(ride.driver.id, "available")
+                # Update all active rides (and their drivers' locations) in one step;
+                # only the moving rides' slots are visited, never the whole ride table
+                arrived, completed = self._advance_rides(delta_time)
+            for ride_id in arrived:
+                # Driver arrived at pickup: auto-start ride after a short delay,
+                # without holding up the other rides
+                heapq.heappush(pending, (current_time + 1.0 / self.simulation_speed, ride_id, 'start'))
+            for ride_id in completed:
+                # Ride completed: make the driver available again after a delay
+                heapq.heappush(pending, (current_time + 5.0, ride_id, 'release'))
             
             # Notify observers
             self.notify_observers()
             
-            # Sleep
-            time.sleep(0.1)
+            # Sleep until the next tick is due; after an overrun, start the
+            # next tick right away and schedule from there instead of catching up
+            next_tick += TICK_INTERVAL
+            sleep_for = next_tick - time.monotonic()
+            if sleep_for > 0:
+                time.sleep(sleep_for)
+            else:
+                next_tick = time.monotonic()
     
     def start_simulation(self):
         """Start the simulation."""
@@ -587,6 +1007,162 @@ class RideSimulator:
             self.simulation_thread = None
 
 
+def _driver_state(driver: Driver) -> Dict:
+    """
+    Build the state entry of an available driver.
+    
+    Args:
+        driver: The driver
+        
+    Returns:
+        Dictionary with the driver's state
+    """
+    return {
+        'id': driver.id,
+        'name': driver.name,
+        'location': driver.current_location,
+        'vehicle_type': driver.vehicle_type
+    }
+
+
+def _diff_section(published: Dict[str, tuple], current: Dict[str, tuple], make_entry) -> Dict:
+    """
+    Diff one section of the simulation state against what was last published.
+    
+    Args:
+        published: ID -> comparison key as last published; updated in place
+        current: ID -> (comparison key, item) for the current state
+        make_entry: Function building the state entry of an item
+        
+    Returns:
+        Dictionary with 'added', 'updated' (ID -> entry) and 'removed' (IDs)
+    """
+    section = {'added': {}, 'updated': {}, 'removed': []}
+    
+    for item_id, (key, item) in current.items():
+        old_key = published.get(item_id)
+        if old_key is None:
+            section['added'][item_id] = make_entry(item)
+        elif old_key != key:
+            section['updated'][item_id] = make_entry(item)
+        published[item_id] = key
+    
+    for item_id in [item_id for item_id in published if item_id not in current]:
+        del published[item_id]
+        section['removed'].append(item_id)
+    
+    return section
+
+
+def _state_as_changes(simulation_state: Dict) -> Dict:
+    """
+    Express a full simulation state as changes, with every entry added.
+    
+    Args:
+        simulation_state: State from get_simulation_state
+        
+    Returns:
+        Changes in the get_simulation_changes format
+    """
+    return {
+        'timestamp': simulation_state['timestamp'],
+        'active_rides': {'added': dict(simulation_state['active_rides']), 'updated': {}, 'removed': []},
+        'available_drivers': {
+            'added': {driver['id']: driver for driver in simulation_state['available_drivers']},
+            'updated': {},
+            'removed': []
+        }
+    }
+
+
+def _merge_changes(pending: Dict, changes: Dict):
+    """
+    Fold newer changes into changes not yet delivered, in place.
+    
+    Args:
+        pending: Undelivered changes, updated in place
+        changes: Newer changes
+    """
+    pending['timestamp'] = changes['timestamp']
+    
+    for name in ('active_rides', 'available_drivers'):
+        old, new = pending[name], changes[name]
+        
+        # A removal is always passed on, even for an entry added since the last
+        # delivery: the observer may have it from the initial full state
+        for item_id in new['removed']:
+            old['added'].pop(item_id, None)
+            old['updated'].pop(item_id, None)
+            if item_id not in old['removed']:
+                old['removed'].append(item_id)
+        
+        for item_id, entry in new['added'].items():
+            if item_id in old['removed']:
+                old['removed'].remove(item_id)
+            old['updated'].pop(item_id, None)
+            old['added'][item_id] = entry
+        
+        for item_id, entry in new['updated'].items():
+            if item_id in old['added']:
+                old['added'][item_id] = entry
+            else:
+                old['updated'][item_id] = entry
+
+
+class _ChangeMailbox:
+    """Holds the simulation changes not yet taken by one observer, merged into one."""
+    
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._pending = None
+    
+    def put(self, changes: Dict):
+        """
+        Add changes, merging them with any undelivered ones.
+        
+        Args:
+            changes: Changes in the get_simulation_changes format (not modified)
+        """
+        with self._condition:
+            if self._pending is None:
+                self._pending = {
+                    'timestamp': changes['timestamp'],
+                    'active_rides': {'added': {}, 'updated': {}, 'removed': []},
+                    'available_drivers': {'added': {}, 'updated': {}, 'removed': []}
+                }
+            _merge_changes(self._pending, changes)
+            self._condition.notify()
+    
+    def get(self) -> Dict:
+        """
+        Take all undelivered changes, waiting until there are some.
+        
+        Returns:
+            The merged changes
+        """
+        with self._condition:
+            while self._pending is None:
+                self._condition.wait()
+            changes, self._pending = self._pending, None
+            return changes
+
+
+def _run_observer(callback, updates):
+    """
+    Deliver queued simulation updates to an observer, forever.
+    
+    Args:
+        callback: The observer
+        updates: Queue (or _ChangeMailbox) of updates for this observer
+    """
+    while True:
+        simulation_state = updates.get()
+        try:
+            callback(simulation_state)
+        except Exception as e:
+            print(f"Error in simulation observer: {e}")
+
+
 def print_simulation_update(simulation_state):
     """
     Print simulation state updates to console.
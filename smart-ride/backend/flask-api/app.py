@@ -1,3 +1,4 @@
+import os
 from flask import Flask, jsonify
 from flask_cors import CORS
 from routes.route import route_bp
@@ -5,9 +6,16 @@ from routes.match import match_bp
 from routes.auth import auth_bp
 from routes.otp import otp_bp
 from routes.rides import rides_bp
+from utils import json_handler
+
+# Origins allowed to call the API: the Vite dev server unless CORS_ORIGINS
+# holds a comma-separated list
+CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:3001,http://127.0.0.1:3001').split(',')
 
 app = Flask(__name__)
-CORS(app)  # Enable CORS for all routes
+app.logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))  # LOG_LEVEL=DEBUG for request logs
+json_handler.init_app(app)  # orjson-backed jsonify when available
+CORS(app, origins=CORS_ORIGINS)  # Enable CORS for all routes
 
 # Register blueprints
 app.register_blueprint(route_bp, url_prefix='/api/route')
@@ -21,4 +29,8 @@ def health_check():
     return jsonify({'status': 'ok', 'message': 'Server is running'})
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    # Development server; debug mode only with FLASK_DEBUG=1. In production use a
+    # threaded WSGI server with a single process, since the ride simulator and
+    # its state live in this process:
+    #   gunicorn -w 1 -k gthread --threads 8 app:app
+    app.run(threaded=True)
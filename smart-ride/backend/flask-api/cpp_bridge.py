@@ -1,8 +1,76 @@
-import subprocess, json
+import os, queue, subprocess, threading
+from utils.json_handler import dumps, loads
+
+# Worker processes kept per executable, so concurrent requests (the app runs
+# threaded) don't queue behind one process; override with CPP_WORKERS
+POOL_SIZE = int(os.environ.get('CPP_WORKERS', min(4, os.cpu_count() or 1)))
+
+# The C++ executables are started once and kept running: each request is one
+# line of JSON on stdin, answered by one line of JSON on stdout. This saves a
+# fork/exec per call. A worker whose process has exited (including one-shot
+# binaries that answer a single line and quit) is restarted on the next call.
+class CppWorker:
+    def __init__(self, executable):
+        self.executable = executable
+        self.process = None
+        self.lock = threading.Lock()
+
+    def _start(self):
+        self.process = subprocess.Popen(
+            [self.executable], stdin=subprocess.PIPE, stdout=subprocess.PIPE, bufsize=0
+        )
+
+    def _roundtrip(self, message):
+        if self.process is None or self.process.poll() is not None:
+            self._start()
+        self.process.stdin.write(message)
+        return self.process.stdout.readline()
+
+    def call(self, data):
+        message = dumps(data) + b"\n"
+        with self.lock:
+            try:
+                line = self._roundtrip(message)
+            except (BrokenPipeError, OSError):
+                line = b""
+            if not line:
+                # The process went away between calls; retry once on a fresh one
+                self.close()
+                line = self._roundtrip(message)
+        return loads(line)
+
+    def close(self):
+        if self.process is not None:
+            self.process.kill()
+            self.process.wait()
+            self.process = None
+
+# A fixed set of workers for one executable; each call borrows an idle worker,
+# and processes are only started once that many calls overlap
+class CppWorkerPool:
+    def __init__(self, executable, size=POOL_SIZE):
+        self.idle = queue.LifoQueue()  # most recently used first, so extra workers stay unstarted
+        for _ in range(max(1, size)):
+            self.idle.put(CppWorker(executable))
+
+    def call(self, data):
+        worker = self.idle.get()
+        try:
+            return worker.call(data)
+        finally:
+            self.idle.put(worker)
+
+_pools = {}
+_pools_lock = threading.Lock()
 
 def run_cpp_exec(executable, data):
-    process = subprocess.Popen(
-        [executable], stdin=subprocess.PIPE, stdout=subprocess.PIPE
-    )
-    output, _ = process.communicate(input=json.dumps(data).encode())
-    return json.loads(output)
+    with _pools_lock:
+        pool = _pools.get(executable)
+        if pool is None:
+            pool = _pools[executable] = CppWorkerPool(executable)
+    return pool.call(data)
+
+# Send a whole list of requests in one round-trip ({"batch": [...]}) instead of
+# one call per request; returns the responses in the same order
+def run_cpp_exec_batch(executable, batch):
+    return run_cpp_exec(executable, {"batch": list(batch)})["batch"]
@@ -1,8 +1,8 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 import os
-import json
 import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
+from utils import json_store
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -11,43 +11,35 @@ auth_bp = Blueprint('auth', __name__)
 USER_DB_FILE = os.path.join(os.path.dirname(__file__), '../database/users.json')
 DRIVER_DB_FILE = os.path.join(os.path.dirname(__file__), '../database/drivers.json')
 
+# Password KDF, pinned so its cost doesn't change with werkzeug upgrades; hashes
+# made with anything else are rehashed on the next successful login
+PASSWORD_HASH_METHOD = 'scrypt:32768:8:1'
+
 def get_users():
     if not os.path.exists(os.path.dirname(USER_DB_FILE)):
         os.makedirs(os.path.dirname(USER_DB_FILE))
     
     if not os.path.exists(USER_DB_FILE):
-        with open(USER_DB_FILE, 'w') as f:
-            json.dump([], f)
+        json_store.save(USER_DB_FILE, [])
         return []
     
-    with open(USER_DB_FILE, 'r') as f:
-        try:
-            return json.load(f)
-        except json.JSONDecodeError:
-            return []
+    return json_store.load(USER_DB_FILE, list)
 
 def save_users(users):
-    with open(USER_DB_FILE, 'w') as f:
-        json.dump(users, f, indent=2)
+    json_store.save(USER_DB_FILE, users)
         
 def get_drivers():
     if not os.path.exists(os.path.dirname(DRIVER_DB_FILE)):
         os.makedirs(os.path.dirname(DRIVER_DB_FILE))
     
     if not os.path.exists(DRIVER_DB_FILE):
-        with open(DRIVER_DB_FILE, 'w') as f:
-            json.dump([], f)
+        json_store.save(DRIVER_DB_FILE, [])
         return []
     
-    with open(DRIVER_DB_FILE, 'r') as f:
-        try:
-            return json.load(f)
-        except json.JSONDecodeError:
-            return []
+    return json_store.load(DRIVER_DB_FILE, list)
 
 def save_drivers(drivers):
-    with open(DRIVER_DB_FILE, 'w') as f:
-        json.dump(drivers, f, indent=2)
+    json_store.save(DRIVER_DB_FILE, drivers)
 
 @auth_bp.route('/signup', methods=['POST'])
 def signup():
@@ -63,16 +55,18 @@ def signup():
     
     # Check if user already exists
     users = get_users()
-    if any(user['email'] == email for user in users):
+    emails = json_store.index(USER_DB_FILE, users, 'email')
+    if email in emails:
         return jsonify({'status': 'error', 'message': 'User already exists'}), 409
     
     # Create new user
     new_user = {
         'email': email,
-        'password_hash': generate_password_hash(password),
+        'password_hash': generate_password_hash(password, method=PASSWORD_HASH_METHOD),
         'name': name
     }
     
+    emails[email] = len(users)
     users.append(new_user)
     save_users(users)
     
@@ -88,7 +82,7 @@ def signup():
 @auth_bp.route('/driver/signup', methods=['POST'])
 def driver_signup():
     data = request.get_json()
-    print(f"Driver signup request: {data}")
+    current_app.logger.debug("Driver signup request for %s", data and data.get('email'))
     
     # Validate input
     if not data or not data.get('email') or not data.get('password') or not data.get('name') or not data.get('licenseNumber'):
@@ -103,13 +97,14 @@ def driver_signup():
     
     # Check if driver already exists
     drivers = get_drivers()
-    if any(driver['email'] == email for driver in drivers):
+    emails = json_store.index(DRIVER_DB_FILE, drivers, 'email')
+    if email in emails:
         return jsonify({'status': 'error', 'message': 'Driver already exists'}), 409
     
     # Create new driver
     new_driver = {
         'email': email,
-        'password_hash': generate_password_hash(password),
+        'password_hash': generate_password_hash(password, method=PASSWORD_HASH_METHOD),
         'name': name,
         'phone': phone,
         'license_number': license_number,
@@ -119,6 +114,7 @@ def driver_signup():
         'created_at': datetime.datetime.now().isoformat()
     }
     
+    emails[email] = len(drivers)
     drivers.append(new_driver)
     save_drivers(drivers)
     
@@ -146,21 +142,20 @@ def login():
     
     if is_driver:
         # Find driver
-        drivers = get_drivers()
-        user = next((driver for driver in drivers if driver['email'] == email), None)
+        records, db_file = get_drivers(), DRIVER_DB_FILE
     else:
         # Find regular user
-        users = get_users()
-        user = next((user for user in users if user['email'] == email), None)
+        records, db_file = get_users(), USER_DB_FILE
+    i = json_store.index(db_file, records, 'email').get(email)
+    user = records[i] if i is not None else None
     
-    # For demonstration purposes, we'll accept any password for existing users
-    # In a real app, you would properly verify the password hash
-    if not user:
+    if not user or not check_password_hash(user.get('password_hash', ''), password):
         return jsonify({'status': 'error', 'message': 'Invalid email or password'}), 401
     
-    # Skip password verification for now since we're using different hash formats
-    # if not check_password_hash(user['password_hash'], password):
-    #     return jsonify({'status': 'error', 'message': 'Invalid email or password'}), 401
+    # Migrate hashes made with another KDF now that we have the password
+    if not user['password_hash'].startswith(PASSWORD_HASH_METHOD + '$'):
+        user['password_hash'] = generate_password_hash(password, method=PASSWORD_HASH_METHOD)
+        json_store.save(db_file, records)
     
     user_data = {
         'email': user['email'],
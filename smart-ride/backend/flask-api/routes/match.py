@@ -1,32 +1,112 @@
 from flask import Blueprint, request, jsonify
-import json
 import os
 import random
 import math
+from collections import namedtuple
 from datetime import datetime
+import numpy as np
+from algorithms._numba_kernels import EARTH_RADIUS_KM, closest_within
+from utils import json_store
 
 match_bp = Blueprint('match', __name__)
 
-# Helper function to calculate distance between two coordinates using Haversine formula
-def calculate_distance(lat1, lon1, lat2, lon2):
+DRIVERS_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'drivers.json')
+
+MATCH_RADIUS_KM = 10  # Only drivers this close to the pickup are matched
+KM_PER_DEGREE = 6371 * math.pi / 180
+GRID_CELL_DEG = 0.1  # Driver grid cells are about 11 km tall
+GRID_MIN_DRIVERS = 64  # With fewer drivers every one is checked
+BASE_FARE = 50  # Base fare in rupees
+PER_KM_RATE = {
+    'mini': 12,
+    'sedan': 15,
+    'premium': 20,
+    'xl': 25
+}
+DEFAULT_PER_KM_RATE = PER_KM_RATE['mini']
+RIDE_TYPES = tuple(PER_KM_RATE)  # Ride types with a precomputed driver mask
+
+# Structure-of-arrays view of a drivers list: coordinates in radians with the
+# cosine of each latitude, availability flags and ride types by driver index,
+# a bool mask per standard ride type, and the grid mapping each (lat, lng) cell
+# to the indexes of its drivers
+DriverTable = namedtuple('DriverTable', ['lat_r', 'lng_r', 'cos_lat', 'available', 'ride_types',
+                                         'ride_type_masks', 'grid'])
+
+# Helper function to calculate the distance from a point to another coordinate
+# using Haversine formula; the point's radians and the cosine of its latitude
+# are passed in, so they are computed once per request (see find_match)
+def calculate_distance(lat1_r, lon1_r, cos_lat1, lat2, lon2):
     # Convert latitude and longitude from degrees to radians
-    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-    
-    # Haversine formula
-    dlon = lon2 - lon1
-    dlat = lat2 - lat1
-    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-    c = 2 * math.asin(math.sqrt(a))
-    r = 6371  # Radius of Earth in kilometers
-    return c * r
+    lat2, lon2 = math.radians(lat2), math.radians(lon2)
+    
+    # Haversine formula, as in closest_within; near-antipodal points can round
+    # a above 1, which asin would reject
+    dlon = lon2 - lon1_r
+    dlat = lat2 - lat1_r
+    a = math.sin(dlat * 0.5)**2 + cos_lat1 * math.cos(lat2) * math.sin(dlon * 0.5)**2
+    return 2.0 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+
+# Helper function to collect the driver coordinates into an array of (lat, lng)
+# rows; drivers without a valid location get NaN, which never matches
+def driver_coordinates(drivers):
+    coords = np.full((len(drivers), 2), np.nan)
+    for i, driver in enumerate(drivers):
+        try:
+            location = driver.get('current_location', {})
+            coords[i] = (float(location.get('lat', 0)), float(location.get('lng', 0)))
+        except (ValueError, TypeError, AttributeError):
+            continue
+    return coords
+
+# Helper function to build the DriverTable of a drivers list
+def index_drivers(drivers):
+    coords = driver_coordinates(drivers)
+    valid = np.flatnonzero(~np.isnan(coords).any(axis=1))
+    cells = np.floor(coords[valid] / GRID_CELL_DEG).astype(np.int64)
+    
+    grid = {}
+    for i, cell in zip(valid.tolist(), map(tuple, cells.tolist())):
+        grid.setdefault(cell, []).append(i)
+    
+    coords_rad = np.radians(coords)
+    ride_types = [driver.get('ride_types', ['mini']) for driver in drivers]
+    return DriverTable(
+        lat_r=coords_rad[:, 0].copy(),
+        lng_r=coords_rad[:, 1].copy(),
+        cos_lat=np.cos(coords_rad[:, 0]),
+        available=np.fromiter((driver.get('status') == 'available' for driver in drivers),
+                              dtype=bool, count=len(drivers)),
+        ride_types=ride_types,
+        ride_type_masks={
+            ride_type: np.fromiter((ride_type in types for types in ride_types), dtype=bool, count=len(drivers))
+            for ride_type in RIDE_TYPES
+        },
+        grid=grid
+    )
+
+# Helper function to get the indexes (in file order) of the drivers in the grid
+# cells within MATCH_RADIUS_KM of a location
+def nearby_drivers(grid, lat, lng):
+    ci, cj = math.floor(lat / GRID_CELL_DEG), math.floor(lng / GRID_CELL_DEG)
+    
+    # Cells narrow with latitude, so more columns are probed away from the equator
+    cos_lat = math.cos(math.radians(min(abs(lat) + GRID_CELL_DEG, 89.9)))
+    di = math.ceil(MATCH_RADIUS_KM / (KM_PER_DEGREE * GRID_CELL_DEG))
+    dj = min(math.ceil(di / cos_lat), int(180 / GRID_CELL_DEG))
+    
+    candidates = []
+    for i in range(ci - di, ci + di + 1):
+        for j in range(cj - dj, cj + dj + 1):
+            candidates.extend(grid.get((i, j), ()))
+    return np.sort(np.asarray(candidates, dtype=np.intp))
 
 # Helper function to load drivers from JSON file
 def load_drivers():
-    drivers_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'drivers.json')
+    drivers_file = DRIVERS_FILE
     try:
         if os.path.exists(drivers_file):
-            with open(drivers_file, 'r') as file:
-                return json.load(file)
+            return json_store.load(drivers_file, list)
         return []
     except Exception as e:
         print(f"Error loading drivers: {e}")
@@ -34,22 +114,22 @@ def load_drivers():
 
 # Helper function to update driver status
 def update_driver_status(driver_id, status, current_location=None):
-    drivers_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'drivers.json')
+    drivers_file = DRIVERS_FILE
     try:
         drivers = []
         if os.path.exists(drivers_file):
-            with open(drivers_file, 'r') as file:
-                drivers = json.load(file)
-        
-        for driver in drivers:
-            if driver.get('id') == driver_id:
-                driver['status'] = status
-                if current_location:
-                    driver['current_location'] = current_location
-                driver['last_updated'] = datetime.now().isoformat()
+            drivers = json_store.load(drivers_file, list)
         
-        with open(drivers_file, 'w') as file:
-            json.dump(drivers, file, indent=2)
+        i = json_store.index(drivers_file, drivers, 'id').get(driver_id)
+        if i is not None:
+            driver = drivers[i]
+            driver['status'] = status
+            if current_location:
+                driver['current_location'] = current_location
+            driver['last_updated'] = datetime.now().isoformat()
+            
+            # Status pings come often, so their writes are coalesced
+            json_store.save_later(drivers_file, drivers)
         return True
     except Exception as e:
         print(f"Error updating driver status: {e}")
@@ -77,60 +157,66 @@ def find_match():
         drop_lng = float(drop_location.get('lng'))
     except (ValueError, TypeError, AttributeError):
         return jsonify({'status': 'error', 'message': 'Invalid location coordinates'}), 400
+    if not all(map(math.isfinite, (pickup_lat, pickup_lng, drop_lat, drop_lng))):
+        return jsonify({'status': 'error', 'message': 'Invalid location coordinates'}), 400
     
     # Load all available drivers
     all_drivers = load_drivers()
     
+    # Narrow the drivers down to the grid cells around the pickup
+    table = json_store.derive(DRIVERS_FILE, all_drivers, index_drivers)
+    if len(all_drivers) < GRID_MIN_DRIVERS:
+        candidates = np.arange(len(all_drivers))
+    else:
+        candidates = nearby_drivers(table.grid, pickup_lat, pickup_lng)
+    
     # Filter drivers by availability and ride type
-    available_drivers = []
-    for driver in all_drivers:
-        if driver.get('status') == 'available' and ride_type in driver.get('ride_types', ['mini']):
-            # Calculate distance from pickup
-            try:
-                driver_lat = float(driver.get('current_location', {}).get('lat', 0))
-                driver_lng = float(driver.get('current_location', {}).get('lng', 0))
-                
-                distance_to_pickup = calculate_distance(pickup_lat, pickup_lng, driver_lat, driver_lng)
-                
-                # Only consider drivers within 10km of pickup location
-                if distance_to_pickup <= 10:
-                    driver['distance_to_pickup'] = distance_to_pickup
-                    available_drivers.append(driver)
-            except (ValueError, TypeError):
-                continue
-    
-    # Sort drivers by distance to pickup
-    available_drivers.sort(key=lambda x: x.get('distance_to_pickup', float('inf')))
+    candidates = candidates[table.available[candidates]]
+    if not isinstance(ride_type, str):
+        # Ride types are strings; anything else matches no driver
+        eligible = np.zeros(len(candidates), dtype=bool)
+    elif ride_type in table.ride_type_masks:
+        eligible = table.ride_type_masks[ride_type][candidates]
+    else:
+        # Not a standard ride type: test each candidate
+        eligible = np.fromiter(
+            (ride_type in table.ride_types[i] for i in candidates.tolist()),
+            dtype=bool, count=len(candidates)
+        )
+    
+    # Pickup in radians, shared by every distance calculation below
+    pickup_lat_r, pickup_lng_r = math.radians(pickup_lat), math.radians(pickup_lng)
+    cos_pickup_lat = math.cos(pickup_lat_r)
+    
+    # Find the closest candidate within 10km of pickup location in one pass
+    closest, distance_to_pickup = closest_within(
+        pickup_lat_r, pickup_lng_r, cos_pickup_lat,
+        table.lat_r[candidates], table.lng_r[candidates], table.cos_lat[candidates], eligible, MATCH_RADIUS_KM
+    )
     
     # If no drivers available, return error
-    if not available_drivers:
+    if closest < 0:
         return jsonify({
             'status': 'error', 
             'message': 'No drivers available near your location. Please try again later.'
         }), 404
     
     # Select the closest driver
-    matched_driver = available_drivers[0]
+    matched_driver = all_drivers[candidates[closest]]
     
     # Calculate ETA based on distance (simplified: assume 2 min per km with minimum of 3 minutes)
-    eta_minutes = max(3, round(matched_driver.get('distance_to_pickup', 0) * 2))
+    eta_minutes = max(3, round(distance_to_pickup * 2))
     
     # Update driver status to 'assigned'
     update_driver_status(matched_driver.get('id'), 'assigned')
     
     # Calculate ride distance and fare
-    ride_distance = calculate_distance(pickup_lat, pickup_lng, drop_lat, drop_lng)
+    ride_distance = calculate_distance(pickup_lat_r, pickup_lng_r, cos_pickup_lat, drop_lat, drop_lng)
     
     # Base fare calculation (simplified)
-    base_fare = 50  # Base fare in rupees
-    per_km_rate = {
-        'mini': 12,
-        'sedan': 15,
-        'premium': 20,
-        'xl': 25
-    }.get(ride_type, 12)  # Default to mini rate if ride_type not found
+    per_km_rate = PER_KM_RATE.get(ride_type, DEFAULT_PER_KM_RATE)
     
-    estimated_fare = round(base_fare + (ride_distance * per_km_rate))
+    estimated_fare = round(BASE_FARE + (ride_distance * per_km_rate))
     
     # Return matched driver details
     return jsonify({
@@ -143,7 +229,7 @@ def find_match():
             'rating': matched_driver.get('rating', 4.5),
             'vehicle': matched_driver.get('vehicle', {}),
             'photo': matched_driver.get('photo', ''),
-            'distance_to_pickup': round(matched_driver.get('distance_to_pickup', 0), 1)
+            'distance_to_pickup': round(distance_to_pickup, 1)
         },
         'ride': {
             'distance': round(ride_distance, 1),
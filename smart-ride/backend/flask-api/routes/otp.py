@@ -1,57 +1,61 @@
-from flask import Blueprint, request, jsonify
-import random
+from flask import Blueprint, request, jsonify, current_app
+import secrets
 import os
-import json
-from datetime import datetime, timedelta
+import time
+from utils import json_store
 
 otp_bp = Blueprint('otp', __name__)
 
 # Simple file-based storage for OTPs
 OTP_DB_FILE = os.path.join(os.path.dirname(__file__), '../database/otps.json')
+OTP_TTL_SECONDS = 600  # 10 minutes
 
 def get_otps():
     if not os.path.exists(os.path.dirname(OTP_DB_FILE)):
         os.makedirs(os.path.dirname(OTP_DB_FILE))
     
     if not os.path.exists(OTP_DB_FILE):
-        with open(OTP_DB_FILE, 'w') as f:
-            json.dump({}, f)
+        json_store.save(OTP_DB_FILE, {})
         return {}
     
-    with open(OTP_DB_FILE, 'r') as f:
-        try:
-            return json.load(f)
-        except json.JSONDecodeError:
-            return {}
+    return json_store.load(OTP_DB_FILE, dict)
 
 def save_otps(otps):
-    with open(OTP_DB_FILE, 'w') as f:
-        json.dump(otps, f, indent=2)
+    json_store.save(OTP_DB_FILE, otps)
+
+# Expiry of a stored OTP as a Unix timestamp; entries from older versions hold
+# an ISO string instead and count as expired, so no datetime parsing is needed
+def get_expiry(otp_data):
+    expires_at = otp_data.get('expires_at')
+    return expires_at if isinstance(expires_at, (int, float)) else 0.0
+
+# Drop every expired OTP, so abandoned ones don't pile up in the file
+def remove_expired(otps, now):
+    for email in [email for email, otp_data in otps.items() if now > get_expiry(otp_data)]:
+        del otps[email]
 
 @otp_bp.route('/generate', methods=['POST'])
 def generate_otp():
     data = request.get_json()
-    print(f"OTP Generate Request: {data}")
-    
     if not data or not data.get('email'):
-        print("Error: Email is required but not provided")
+        current_app.logger.debug("OTP generate request without an email")
         return jsonify({'status': 'error', 'message': 'Email is required'}), 400
     
     email = data.get('email')
-    print(f"Generating OTP for email: {email}")
+    current_app.logger.debug("Generating OTP for %s", email)
     
     # Generate a 6-digit OTP
-    otp = ''.join([str(random.randint(0, 9)) for _ in range(6)])
-    print(f"Generated OTP: {otp}")
+    otp = f"{secrets.randbelow(1000000):06d}"
     
     # Store OTP with expiration time (10 minutes)
     otps = get_otps()
+    now = time.time()
+    remove_expired(otps, now)
     otps[email] = {
         'otp': otp,
-        'expires_at': (datetime.now() + timedelta(minutes=10)).isoformat()
+        'expires_at': now + OTP_TTL_SECONDS
     }
     save_otps(otps)
-    print(f"Saved OTP for {email}: {otp}")
     
     # In a real application, you would send this OTP via email or SMS
     # For demo purposes, we'll just return it in the response
@@ -61,7 +65,6 @@ def generate_otp():
         'otp': otp,  # In production, you would NOT return this in the response
         'email': email
     }
-    print(f"Sending response: {response_data}")
     return jsonify(response_data), 200
 
 @otp_bp.route('/verify', methods=['POST'])
@@ -75,25 +78,26 @@ def verify_otp():
     user_otp = data.get('otp')
     
     otps = get_otps()
+    now = time.time()
     
     if email not in otps:
         return jsonify({'status': 'error', 'message': 'No OTP found for this email'}), 404
     
     stored_otp_data = otps[email]
     stored_otp = stored_otp_data['otp']
-    expires_at = datetime.fromisoformat(stored_otp_data['expires_at'])
     
-    if datetime.now() > expires_at:
-        # Remove expired OTP
-        del otps[email]
+    if now > get_expiry(stored_otp_data):
+        # Remove expired OTPs
+        remove_expired(otps, now)
         save_otps(otps)
         return jsonify({'status': 'error', 'message': 'OTP has expired'}), 400
     
     if user_otp != stored_otp:
         return jsonify({'status': 'error', 'message': 'Invalid OTP'}), 400
     
-    # OTP is valid, remove it from storage
+    # OTP is valid, remove it (and any expired ones) from storage
     del otps[email]
+    remove_expired(otps, now)
     save_otps(otps)
     
     return jsonify({
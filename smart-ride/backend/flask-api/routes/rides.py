@@ -9,8 +9,9 @@ import os
 import json
 import time
 import uuid
-from flask import Blueprint, request, jsonify
-from flask_cors import cross_origin
+from datetime import datetime
+from operator import itemgetter
+from flask import Blueprint, Response, request, jsonify
 
 import sys
 import os
@@ -19,6 +20,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from algorithms.city_graph import CityGraph, create_demo_city_graph
 from algorithms.driver_matching import Driver, RideRequest, DriverMatcher
 from algorithms.simulation import RideSimulator, RideStatus
+from utils.expiring_store import ExpiringStore
+from utils.json_handler import dumps
 
 # Create a Blueprint for the ride routes
 rides_bp = Blueprint('rides', __name__)
@@ -38,42 +41,59 @@ except FileNotFoundError:
 # Initialize the simulator
 simulator = RideSimulator(city_graph)
 
-# In-memory storage for active requests and rides
-active_requests = {}  # request_id -> { request, matched_drivers }
-active_rides = {}  # ride_id -> ride_details
+# In-memory storage for active requests and rides; entries expire, so requests
+# that are never confirmed and long-finished rides don't pile up
+REQUEST_TTL_SECONDS = 30 * 60
+RIDE_TTL_SECONDS = 4 * 60 * 60
+active_requests = ExpiringStore(REQUEST_TTL_SECONDS)  # request_id -> { request, matched_drivers }
+active_rides = ExpiringStore(RIDE_TTL_SECONDS)  # ride_id -> ride_details
+
+
+# Driver fields copied into each /request-ride match, unpacked in one call
+matched_driver_fields = itemgetter('id', 'name', 'rating', 'vehicle_type', 'total_trips', 'current_location')
+
+# Serialized /city-graph response; the graph never changes after startup, so it
+# is built once (reset it to None if an endpoint ever modifies the graph)
+city_graph_json = None
+
+# Last /simulation-state payload as (monotonic time, JSON bytes of the rides and
+# drivers); the frontend polls about once a second, so polls this close together
+# share one encoding and only get a fresh timestamp
+SIMULATION_STATE_CACHE_SECONDS = 0.2
+simulation_state_json = (0.0, None)
 
 
 @rides_bp.route('/city-graph', methods=['GET'])
-@cross_origin()
 def get_city_graph():
     """Get the city graph structure for visualization."""
-    nodes = []
-    for node_id, node in city_graph.nodes.items():
-        nodes.append({
-            'id': node_id,
-            'lat': node.lat,
-            'lng': node.lng,
-            'name': node.name
-        })
-    
-    edges = []
-    for node_id, connections in city_graph.edges.items():
-        for conn_id, edge_data in connections.items():
-            edges.append({
-                'from': node_id,
-                'to': conn_id,
-                'distance': edge_data['distance'],
-                'time': edge_data['time']
+    global city_graph_json
+    if city_graph_json is None:
+        nodes = []
+        edges = []
+        for node_id, node in city_graph.nodes.items():
+            nodes.append({
+                'id': node_id,
+                'lat': node.lat,
+                'lng': node.lng,
+                'name': node.name
             })
+            for conn_id, (distance, edge_time) in node.neighbors.items():
+                edges.append({
+                    'from': node_id,
+                    'to': conn_id,
+                    'distance': distance,
+                    'time': edge_time
+                })
+        
+        city_graph_json = dumps({
+            'nodes': nodes,
+            'edges': edges
+        })
     
-    return jsonify({
-        'nodes': nodes,
-        'edges': edges
-    })
+    return Response(city_graph_json, mimetype='application/json')
 
 
 @rides_bp.route('/simulate-drivers', methods=['POST'])
-@cross_origin()
 def simulate_drivers():
     """Start the simulation and create demo drivers."""
     from ..algorithms.driver_matching import create_demo_drivers
@@ -81,8 +101,7 @@ def simulate_drivers():
     # Add demo drivers if not already added
     if not simulator.driver_matcher.drivers:
         demo_drivers = create_demo_drivers(city_graph)
-        for driver in demo_drivers:
-            simulator.add_driver(driver)
+        simulator.add_drivers(demo_drivers)
     
     # Start the simulation if not already running
     if not simulator.is_running:
@@ -108,7 +127,6 @@ def simulate_drivers():
 
 
 @rides_bp.route('/request-ride', methods=['POST'])
-@cross_origin()
 def request_ride():
     """Request a ride with pickup and dropoff locations."""
     data = request.get_json()
@@ -136,27 +154,25 @@ def request_ride():
     match_result = simulator.request_ride(request_obj)
     
     # Store the request and matches
-    active_requests[request_obj.id] = {
+    active_requests.set(request_obj.id, {
         'request': request_obj,
         'matched_drivers': match_result['matched_drivers']
-    }
+    })
     
     # Prepare response
     drivers = []
-    for driver in match_result['matched_drivers']:
+    for match in match_result['matched_drivers']:
+        driver_id, name, rating, driver_vehicle_type, trips, (lat, lng) = matched_driver_fields(match['driver'])
         drivers.append({
-            'id': driver['driver']['id'],
-            'name': driver['driver']['name'],
-            'rating': driver['driver']['rating'],
-            'vehicle_type': driver['driver']['vehicle_type'],
-            'trips': driver['driver']['total_trips'],
-            'eta_minutes': driver['eta_minutes'],
-            'distance': driver['direct_distance'],
-            'fare': driver['estimated_fare'],
-            'location': {
-                'lat': driver['driver']['current_location'][0],
-                'lng': driver['driver']['current_location'][1]
-            }
+            'id': driver_id,
+            'name': name,
+            'rating': rating,
+            'vehicle_type': driver_vehicle_type,
+            'trips': trips,
+            'eta_minutes': match['eta_minutes'],
+            'distance': match['direct_distance'],
+            'fare': match['estimated_fare'],
+            'location': {'lat': lat, 'lng': lng}
         })
     
     return jsonify({
@@ -178,7 +194,6 @@ def request_ride():
 
 
 @rides_bp.route('/confirm-ride', methods=['POST'])
-@cross_origin()
 def confirm_ride():
     """Confirm a ride with a specific driver."""
     data = request.get_json()
@@ -191,10 +206,11 @@ def confirm_ride():
     driver_id = data['driver_id']
     
     # Check if request exists
-    if request_id not in active_requests:
+    request_details = active_requests.get(request_id)
+    if request_details is None:
         return jsonify({'error': 'Request not found'}), 404
     
-    request_obj = active_requests[request_id]['request']
+    request_obj = request_details['request']
     
     # Confirm the ride
     confirm_result = simulator.confirm_ride(request_obj, driver_id)
@@ -205,7 +221,7 @@ def confirm_ride():
     
     # Store the ride details
     ride_id = confirm_result['ride_id']
-    active_rides[ride_id] = confirm_result
+    active_rides.set(ride_id, confirm_result)
     
     # Prepare response
     return jsonify({
@@ -231,11 +247,11 @@ def confirm_ride():
 
 
 @rides_bp.route('/ride-status/<ride_id>', methods=['GET'])
-@cross_origin()
 def get_ride_status(ride_id):
     """Get the status of a ride."""
     # Check if ride exists
-    if ride_id not in active_rides:
+    ride_details = active_rides.get(ride_id)
+    if ride_details is None:
         return jsonify({'error': 'Ride not found'}), 404
     
     # Get ride status
@@ -245,9 +261,6 @@ def get_ride_status(ride_id):
     if 'error' in status_result:
         return jsonify(status_result), 400
     
-    # Get the ride details
-    ride_details = active_rides[ride_id]
-    
     # Prepare response
     response = {
         'ride_id': ride_id,
@@ -270,7 +283,6 @@ def get_ride_status(ride_id):
 
 
 @rides_bp.route('/start-ride/<ride_id>', methods=['POST'])
-@cross_origin()
 def start_ride(ride_id):
     """Start a ride after the driver has arrived at pickup."""
     # Start the ride
@@ -284,7 +296,6 @@ def start_ride(ride_id):
 
 
 @rides_bp.route('/complete-ride/<ride_id>', methods=['POST'])
-@cross_origin()
 def complete_ride(ride_id):
     """Complete a ride (manually)."""
     # Complete the ride
@@ -298,7 +309,6 @@ def complete_ride(ride_id):
 
 
 @rides_bp.route('/cancel-ride/<ride_id>', methods=['POST'])
-@cross_origin()
 def cancel_ride(ride_id):
     """Cancel a ride."""
     # Cancel the ride
@@ -311,62 +321,74 @@ def cancel_ride(ride_id):
     return jsonify(result)
 
 
+def simulation_state_response(timestamp, payload):
+    """Build a /simulation-state response from a timestamp and an encoded payload."""
+    # Splice the timestamp in as the first key of the payload object
+    body = b'{"timestamp":' + dumps(timestamp) + b',' + payload[1:]
+    return Response(body, mimetype='application/json')
+
+
 @rides_bp.route('/simulation-state', methods=['GET'])
-@cross_origin()
 def get_simulation_state():
     """Get the current state of the simulation."""
+    global simulation_state_json
     if not simulator.is_running:
         return jsonify({'error': 'Simulation is not running'}), 400
     
+    # Polls arriving shortly after the last one reuse its payload
+    now = time.monotonic()
+    cached_at, payload = simulation_state_json
+    if payload is not None and now - cached_at < SIMULATION_STATE_CACHE_SECONDS:
+        return simulation_state_response(datetime.now().isoformat(), payload)
+    
     # Get simulation state
     state = simulator.get_simulation_state()
     
-    # Convert to format suitable for frontend
-    active_rides_list = []
-    for ride_id, ride_data in state['active_rides'].items():
-        active_rides_list.append({
-            'ride_id': ride_id,
-            'status': ride_data['status'],
-            'driver': {
-                'id': ride_data['driver']['id'],
-                'name': ride_data['driver']['name'],
+    # Convert to format suitable for frontend, encoding the entries as they are built
+    payload = dumps({
+        'active_rides': [
+            {
+                'ride_id': ride_id,
+                'status': ride_data['status'],
+                'driver': {
+                    'id': ride_data['driver']['id'],
+                    'name': ride_data['driver']['name'],
+                    'location': {
+                        'lat': ride_data['driver']['current_location'][0],
+                        'lng': ride_data['driver']['current_location'][1]
+                    }
+                },
+                'pickup': {
+                    'lat': ride_data['pickup'][0],
+                    'lng': ride_data['pickup'][1]
+                },
+                'dropoff': {
+                    'lat': ride_data['dropoff'][0],
+                    'lng': ride_data['dropoff'][1]
+                },
+                'progress': ride_data['progress']
+            }
+            for ride_id, ride_data in state['active_rides'].items()
+        ],
+        'available_drivers': [
+            {
+                'id': driver['id'],
+                'name': driver['name'],
                 'location': {
-                    'lat': ride_data['driver']['current_location'][0],
-                    'lng': ride_data['driver']['current_location'][1]
-                }
-            },
-            'pickup': {
-                'lat': ride_data['pickup'][0],
-                'lng': ride_data['pickup'][1]
-            },
-            'dropoff': {
-                'lat': ride_data['dropoff'][0],
-                'lng': ride_data['dropoff'][1]
-            },
-            'progress': ride_data['progress']
-        })
-    
-    available_drivers_list = []
-    for driver in state['available_drivers']:
-        available_drivers_list.append({
-            'id': driver['id'],
-            'name': driver['name'],
-            'location': {
-                'lat': driver['location'][0],
-                'lng': driver['location'][1]
-            },
-            'vehicle_type': driver['vehicle_type']
-        })
-    
-    return jsonify({
-        'timestamp': state['timestamp'],
-        'active_rides': active_rides_list,
-        'available_drivers': available_drivers_list
+                    'lat': driver['location'][0],
+                    'lng': driver['location'][1]
+                },
+                'vehicle_type': driver['vehicle_type']
+            }
+            for driver in state['available_drivers']
+        ]
     })
+    simulation_state_json = (now, payload)
+    
+    return simulation_state_response(state['timestamp'], payload)
 
 
 @rides_bp.route('/toggle-simulation', methods=['POST'])
-@cross_origin()
 def toggle_simulation():
     """Start or stop the simulation."""
     data = request.get_json()
@@ -1,10 +1,14 @@
 from flask import Blueprint, request, jsonify
-from cpp_bridge import run_cpp_exec
+from cpp_bridge import run_cpp_exec, run_cpp_exec_batch
 
 route_bp = Blueprint('route', __name__)
 
 @route_bp.route('/shortest', methods=['POST'])
 def shortest_path():
     data = request.get_json()
-    result = run_cpp_exec('../cpp-core/graph_exec', data)
+    # A list of queries is answered in one round-trip to the executable
+    if isinstance(data, list):
+        result = run_cpp_exec_batch('../cpp-core/graph_exec', data)
+    else:
+        result = run_cpp_exec('../cpp-core/graph_exec', data)
     return jsonify(result)
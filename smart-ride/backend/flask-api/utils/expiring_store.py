@@ -0,0 +1,76 @@
+"""
+Expiring Store Module
+
+An in-process key-value store whose entries expire a fixed time after they
+were last set, used for ride state that clients only need for a while (e.g.
+open ride requests). Expired entries are dropped as new ones are added, so the
+store stays bounded by the traffic of one TTL.
+
+Time Complexity Analysis:
+- get / contains: O(1)
+- set: O(1) amortized; every entry is purged at most once
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class ExpiringStore:
+    """Thread-safe store whose entries expire ttl seconds after they were set."""
+
+    def __init__(self, ttl: float):
+        """
+        Initialize an empty store.
+
+        Args:
+            ttl: Lifetime of an entry in seconds
+        """
+        self.ttl = ttl
+        # key -> (expiry, value); every set moves its key to the end, so the
+        # entries are always in expiry order
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def set(self, key, value):
+        """
+        Store a value, replacing any previous one and restarting its lifetime.
+
+        Args:
+            key: The key
+            value: The value
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (now + self.ttl, value)
+            self._purge(now)
+
+    def get(self, key, default=None):
+        """
+        Get a value that has not expired.
+
+        Args:
+            key: The key
+            default: Value returned when the key is missing or expired
+
+        Returns:
+            The stored value or default
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return default
+        return entry[1]
+
+    def __contains__(self, key) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+
+    def _purge(self, now: float):
+        """Drop the expired entries (the caller holds the lock)."""
+        entries = self._entries
+        while entries:
+            key, (expiry, _) = next(iter(entries.items()))
+            if expiry > now:
+                break
+            del entries[key]
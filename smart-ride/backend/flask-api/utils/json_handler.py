@@ -0,0 +1,87 @@
+"""
+JSON Handling Module
+
+JSON encoding and decoding shared by the Flask app and the C++ bridge. orjson
+is used when it is installed: it serializes several times faster than the
+standard library and encodes NumPy arrays directly. Without it everything falls
+back to the json module.
+"""
+
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(data, indent: bool = False) -> bytes:
+    """
+    Serialize data to JSON, compact unless indent is set.
+
+    Args:
+        data: The data to serialize
+        indent: Indent nested values by two spaces
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(data, option=option)
+    if indent:
+        return json.dumps(data, indent=2).encode()
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+def loads(raw):
+    """
+    Parse JSON.
+
+    Args:
+        raw: JSON as bytes or str
+
+    Returns:
+        The decoded data
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes and decodes with orjson."""
+
+    def _option(self) -> int:
+        # Non-string keys are converted like json does, and NumPy values are encoded
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self.default, option=self._option()).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response, skipping a decode/encode
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._option() | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_app(app):
+    """
+    Make an app's jsonify and request.get_json use orjson, if it is installed.
+
+    Args:
+        app: The Flask app
+    """
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
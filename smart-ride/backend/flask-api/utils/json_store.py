@@ -0,0 +1,215 @@
+"""
+JSON File Store Module
+
+Loading and saving of the JSON files the routes use as their database. Parsed
+files are kept in memory and reused until the file's modification time or size
+changes, so a request only reads and parses a file after it was written.
+
+The returned data is shared between requests: callers that modify it must save
+it right away (as the routes do) and must not add request-only fields to it.
+
+Files are written compactly to a temporary file that then replaces the
+original, so a crash mid-write never leaves a truncated database. Set
+PRETTY_JSON=1 to write indented files for debugging.
+
+Frequently updated files can use save_later instead of save: the change is
+visible to load right away, and the writes of the next FLUSH_INTERVAL seconds
+(or FLUSH_MAX_UPDATES updates) are coalesced into one. Pending writes are
+flushed at exit; a crash loses at most one interval of updates.
+"""
+
+import atexit
+import os
+import threading
+
+from utils.json_handler import dumps, loads
+
+PRETTY_JSON = os.environ.get('PRETTY_JSON', '') not in ('', '0')
+FLUSH_INTERVAL = 1.0  # Seconds a save_later waits for further updates
+FLUSH_MAX_UPDATES = 100  # Updates after which a save_later writes right away
+
+_cache = {}  # path -> ((mtime_ns, size), data)
+_indexes = {}  # (path, field) -> (data, index)
+_derived = {}  # (path, build) -> ((mtime_ns, size), data, result)
+_pending = {}  # path -> (('pending', version), data, updates) awaiting a flush
+_timers = {}  # path -> timer flushing the pending data
+_version = 0
+_lock = threading.Lock()
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def load(path, default):
+    """
+    Load a JSON file, reusing the parsed data while the file is unchanged.
+
+    Args:
+        path: Path of the JSON file
+        default: Callable returning the data of a missing or invalid file (e.g. list)
+
+    Returns:
+        The parsed data
+    """
+    with _lock:
+        pending = _pending.get(path)
+    if pending is not None:
+        return pending[1]
+
+    try:
+        stamp = _stamp(path)
+    except FileNotFoundError:
+        return default()
+
+    with _lock:
+        cached = _cache.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    # A write between the stat and the read only makes the next load parse again
+    with open(path, 'rb') as f:
+        raw = f.read()
+    try:
+        data = loads(raw)
+    except ValueError:
+        return default()
+
+    with _lock:
+        _cache[path] = (stamp, data)
+    return data
+
+
+def save(path, data):
+    """
+    Atomically write data to a JSON file and keep it as the file's cached data.
+
+    Args:
+        path: Path of the JSON file
+        data: The data to write
+    """
+    # This write supersedes any pending one
+    with _lock:
+        _pending.pop(path, None)
+        timer = _timers.pop(path, None)
+    if timer is not None:
+        timer.cancel()
+
+    raw = dumps(data, indent=PRETTY_JSON)
+
+    # Unique per thread, so concurrent saves never share a temporary file
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+    with _lock:
+        _cache[path] = (_stamp(path), data)
+
+
+def save_later(path, data):
+    """
+    Make data the file's data now and write it with the following updates.
+
+    Args:
+        path: Path of the JSON file
+        data: The data to write
+    """
+    global _version
+
+    with _lock:
+        _version += 1
+        pending = _pending.get(path)
+        updates = pending[2] + 1 if pending is not None else 1
+        _pending[path] = (('pending', _version), data, updates)
+        if updates < FLUSH_MAX_UPDATES and path not in _timers:
+            timer = threading.Timer(FLUSH_INTERVAL, flush, args=(path,))
+            timer.daemon = True
+            _timers[path] = timer
+            timer.start()
+
+    if updates >= FLUSH_MAX_UPDATES:
+        flush(path)
+
+
+def flush(path=None):
+    """
+    Write the pending data of a file, or of every file if path is None.
+
+    Args:
+        path: Path of the JSON file
+    """
+    with _lock:
+        paths = [path] if path is not None else list(_pending)
+        pending = [(p, _pending[p][1]) for p in paths if p in _pending]
+    for p, data in pending:
+        save(p, data)
+
+
+atexit.register(flush)
+
+
+def index(path, records, field):
+    """
+    Get a lookup table of a list of records loaded from a file.
+
+    The table is built once per loaded version of the file. Callers that
+    append a record must add it to the table as well.
+
+    Args:
+        path: Path the records were loaded from
+        records: The list returned by load
+        field: Name of the field to index by
+
+    Returns:
+        Dictionary of field value -> position of the first record with it
+    """
+    with _lock:
+        cached = _indexes.get((path, field))
+    if cached is not None and cached[0] is records:
+        return cached[1]
+
+    table = {}
+    for i, record in enumerate(records):
+        table.setdefault(record.get(field), i)
+
+    with _lock:
+        _indexes[(path, field)] = (records, table)
+    return table
+
+
+def derive(path, data, build):
+    """
+    Get a value computed from the data loaded from a file.
+
+    The value is cached until the file is saved or changes on disk; data that
+    is not the file's cached data is never cached.
+
+    Args:
+        path: Path the data was loaded from
+        data: The data returned by load
+        build: Function computing the value from the data
+
+    Returns:
+        build(data)
+    """
+    with _lock:
+        entry = _pending.get(path) or _cache.get(path)
+        cached = _derived.get((path, build))
+    stamp = entry[0] if entry is not None and entry[1] is data else None
+    if stamp is not None and cached is not None and cached[0] == stamp and cached[1] is data:
+        return cached[2]
+
+    result = build(data)
+    if stamp is not None:
+        with _lock:
+            _derived[(path, build)] = (stamp, data, result)
+    return result